@@ -0,0 +1,47 @@
+from core import rollups, search, summaries, tags
+from core.statistics import Counter, DistinctCounter, Ratio
+from .models import Case
+
+# Counters returned by ``CHWCaseViewSet.statistics``, in response order.
+# The averages are cases per distinct patient_name.
+STATISTICS = {
+    'total_cases': Counter(),
+    'male_cases': Counter(sex='Male'),
+    'female_cases': Counter(sex='Female'),
+    'confirmed_cases': Counter(classification='Confirmed'),
+    'probale_cases': Counter(classification='Probable'),
+    'avg_total_cases': Ratio(Counter(), DistinctCounter('patient_name')),
+    'avg_male_cases': Ratio(Counter(sex='Male'), DistinctCounter('patient_name', sex='Male')),
+    'avg_female_cases': Ratio(Counter(sex='Female'), DistinctCounter('patient_name', sex='Female')),
+    'per_housing_type': Counter(housing_type='Permanent'),
+    'sem_housing_type': Counter(housing_type='Semi-permanent'),
+    'out_visit_type': Counter(visit_type='Outpatient'),
+    'inp_visit_type': Counter(visit_type='Inpatient'),
+    'em_visit_type': Counter(visit_type='Emergency'),
+}
+
+# Fields accepted by ``?fields=`` on the ``distributions`` action.
+DISTRIBUTION_FIELDS = (
+    'district',
+    'sex',
+    'disease',
+    'classification',
+    'visit_type',
+    'housing_type',
+    'reporting_method',
+    'treatment',
+    'follow_up_required',
+    'encounter_location',
+)
+
+# Free-text fields searched by ``?q=``, patient_name first. The PostgreSQL
+# index is built from this list, so changing it needs a new migration.
+SEARCH_FIELDS = ('patient_name', 'symptoms', 'diagnosis', 'notes')
+
+# Comma-separated list fields counted per item, ``{field: m2m field}``.
+TAG_FIELDS = {'symptoms': 'symptom_tags'}
+
+rollups.register(Case, DISTRIBUTION_FIELDS)
+summaries.register(Case, DISTRIBUTION_FIELDS, STATISTICS)
+search.register(Case, SEARCH_FIELDS)
+tags.register(Case, TAG_FIELDS)
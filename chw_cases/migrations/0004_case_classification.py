@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chw_cases', '0003_case_encounter_location_case_follow_up_required_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='classification',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+    ]
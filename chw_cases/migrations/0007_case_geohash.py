@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:57
+
+import core.fields
+from core import geo
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_geohash(apps, schema_editor):
+    Case = apps.get_model('chw_cases', 'Case')
+    cases = (
+        Case.objects
+        .filter(latitude__isnull=False, longitude__isnull=False)
+        .only('id', 'latitude', 'longitude')
+    )
+    batch = []
+    for case in cases.iterator(chunk_size=2000):
+        case.geohash = geo.encode(case.latitude, case.longitude, geo.MAX_PRECISION)
+        batch.append(case)
+        if len(batch) == 2000:
+            Case.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    Case.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chw_cases', '0006_case_idempotency_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='geohash',
+            field=core.fields.GeohashField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['created_by', 'geohash'], name='chw_owner_geohash_idx'),
+        ),
+    ]
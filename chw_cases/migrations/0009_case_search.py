@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from core import search
+
+install_search = search.install(
+    'chw_cases_case', 'chw',
+    ('patient_name', 'symptoms', 'diagnosis', 'notes'),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chw_cases', '0008_case_epicurve_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(*install_search),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:32
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill(apps, schema_editor):
+    # Existing cases have not changed since they were created.
+    apps.get_model('chw_cases', 'Case').objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chw_cases', '0011_case_district_index'),
+        ('core', '0003_casetombstone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['created_by', 'updated_at'], name='chw_owner_updated_idx'),
+        ),
+    ]
@@ -1,9 +1,24 @@
 from rest_framework import serializers
+from core.serializers import SerializationTimingMixin, SparseFieldsetSerializerMixin
 from .models import Case
 
-class CaseSerializer(serializers.ModelSerializer):
+class CaseSerializer(SerializationTimingMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Case
-        fields = '__all__'
-        read_only_fields = ('created_by','created_at',)
-                
\ No newline at end of file
+        # Tags are derived from the text fields on save.
+        exclude = ('symptom_tags',)
+        read_only_fields = ('created_by','created_at','idempotency_key',)
+
+
+class CaseListSerializer(SerializationTimingMixin, SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """
+    Compact representation used by the list endpoint; request more with ?fields=.
+    """
+    class Meta:
+        model = Case
+        fields = (
+            'id', 'created_by', 'created_at', 'patient_name', 'age', 'sex',
+            'disease', 'classification', 'district', 'latitude', 'longitude',
+            'visit_type', 'visit_date',
+        )
+        read_only_fields = fields
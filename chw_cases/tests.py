@@ -0,0 +1,192 @@
+import datetime
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.testing import assert_queries_after_generation
+from users.models import User
+from .analytics import DISTRIBUTION_FIELDS
+from .models import Case
+
+
+@override_settings(ANALYTICS_CACHE=None)
+class StatisticsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='chw', password='pass', role='CHW')
+        self.client.force_authenticate(self.user)
+        Case.objects.create(created_by=self.user, patient_name='Ada', sex='Female', housing_type='Permanent')
+        Case.objects.create(created_by=self.user, patient_name='Ada', sex='Female', visit_type='Emergency')
+        Case.objects.create(created_by=self.user, patient_name='Ben', sex='Male', classification='Confirmed')
+
+    def test_statistics_is_a_single_query(self):
+        with assert_queries_after_generation(self, 1):
+            response = self.client.get(reverse('chw_case-statistics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_cases'], 3)
+        self.assertEqual(response.data['confirmed_cases'], 1)
+        self.assertEqual(response.data['avg_total_cases'], 1.5)
+        self.assertEqual(response.data['avg_female_cases'], 2)
+        self.assertEqual(response.data['avg_male_cases'], 1)
+        self.assertEqual(response.data['per_housing_type'], 1)
+
+    def test_statistics_filters_by_patient_name(self):
+        response = self.client.get(reverse('chw_case-statistics'), {'patient_name': 'ben'})
+        self.assertEqual(response.data['total_cases'], 1)
+        self.assertEqual(response.data['avg_female_cases'], 0)
+
+
+@override_settings(ANALYTICS_CACHE=None)
+class DistributionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='chw', password='pass', role='CHW')
+        self.client.force_authenticate(self.user)
+        Case.objects.create(created_by=self.user, patient_name='Ada', housing_type='Permanent', visit_type='Outpatient')
+        Case.objects.create(created_by=self.user, patient_name='Ben', housing_type='Permanent', visit_type='Emergency')
+
+    def test_distributions_returns_every_field(self):
+        with assert_queries_after_generation(self, 1):
+            response = self.client.get(reverse('chw_case-distributions'))
+        self.assertEqual(list(response.data), list(DISTRIBUTION_FIELDS))
+        self.assertEqual(response.data['housing_type'], [{'housing_type': 'Permanent', 'count': 2}])
+
+    def test_alias_keeps_patient_name_filter(self):
+        response = self.client.get(reverse('chw_case-visits'), {'patient_name': 'ada'})
+        self.assertEqual(response.data, [{'visit_type': 'Outpatient', 'count': 1}])
+
+
+class PaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='chw', password='pass', role='CHW')
+        self.client.force_authenticate(self.user)
+        Case.objects.bulk_create([Case(created_by=self.user, patient_name=f'p{i}') for i in range(5)])
+        self.url = reverse('chw_case-list')
+
+    def test_pages_walk_the_whole_list_once(self):
+        seen = []
+        response = self.client.get(self.url, {'page_size': 2})
+        while True:
+            seen += [row['id'] for row in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(sorted(seen), sorted(Case.objects.values_list('id', flat=True)))
+        self.assertEqual(len(seen), 5)
+
+    @override_settings(CASE_PAGE_SIZE_MAX=3)
+    def test_page_size_is_capped(self):
+        response = self.client.get(self.url, {'page_size': 100})
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_only_staff_can_disable_pagination(self):
+        response = self.client.get(self.url, {'paginate': 'false'})
+        self.assertIn('results', response.data)
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(self.url, {'paginate': 'false'})
+        self.assertEqual(len(response.data), 5)
+
+
+@override_settings(ANALYTICS_CACHE=None, CASE_BULK_CHUNK_SIZE=2)
+class BulkTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='chw', password='pass', role='CHW')
+        self.client.force_authenticate(self.user)
+        self.url = reverse('chw_case-bulk')
+
+    def test_json_array_with_per_item_results(self):
+        payload = [
+            {'idempotency_key': 'a', 'patient_name': 'Ada', 'district': 'Zomba'},
+            {'idempotency_key': 'b', 'patient_name': 'Ben', 'age': 'old'},
+            {'idempotency_key': 'a', 'patient_name': 'Ada again'},
+            {'patient_name': 'Cy', 'district': 'Zomba'},
+            {'patient_name': 'Di', 'district': 'Mzuzu'},
+        ]
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([r['status'] for r in response.data['results']],
+                         ['created', 'invalid', 'duplicate', 'created', 'created'])
+        self.assertIn('age', response.data['results'][1]['errors'])
+        self.assertEqual(Case.objects.filter(created_by=self.user).count(), 3)
+        by_district = self.client.get(reverse('chw_case-by-district')).data
+        self.assertEqual(by_district, [{'district': 'Mzuzu', 'count': 1}, {'district': 'Zomba', 'count': 2}])
+        with self.settings(ANALYTICS_USE_ROLLUPS=True):
+            self.assertEqual(self.client.get(reverse('chw_case-by-district')).data, by_district)
+
+    def test_retried_sync_does_not_duplicate(self):
+        body = '{"idempotency_key": "k1", "patient_name": "Ada"}\n\n{"idempotency_key": "k2"}\n'
+        first = self.client.post(self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(first.data['created'], 2)
+        retry = self.client.post(self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.data['exists'], 2)
+        self.assertEqual([r['id'] for r in retry.data['results']], [r['id'] for r in first.data['results']])
+        self.assertEqual(Case.objects.count(), 2)
+
+    def test_keys_are_scoped_to_the_user(self):
+        other = User.objects.create_user(username='other', password='pass', role='CHW')
+        Case.objects.create(created_by=other, idempotency_key='k1')
+        response = self.client.post(self.url, [{'idempotency_key': 'k1'}], format='json')
+        self.assertEqual(response.data['created'], 1)
+
+    def test_bad_ndjson_line(self):
+        response = self.client.post(self.url, '{"a": 1}\nnot json\n', content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(ANALYTICS_CACHE=None)
+class EpicurveTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='chw', password='pass', role='CHW')
+        self.client.force_authenticate(self.user)
+        for day, disease, district in [(1, 'Malaria', 'Zomba'), (1, 'Malaria', 'Mzuzu'), (4, 'Cholera', 'Zomba'), (16, 'Malaria', 'Zomba')]:
+            case = Case.objects.create(created_by=self.user, disease=disease, district=district,
+                                       visit_date=datetime.date(2024, 1, day))
+            Case.objects.filter(pk=case.pk).update(created_at=datetime.datetime(2024, 1, day, 12, tzinfo=datetime.timezone.utc))
+        self.url = reverse('chw_case-epicurve')
+
+    def test_daily_curve_fills_gaps(self):
+        response = self.client.get(self.url, {'interval': 'day', 'disease': 'Malaria'})
+        buckets = response.data['buckets']
+        self.assertEqual(len(buckets), 16)
+        self.assertEqual(buckets[0], {'period': datetime.date(2024, 1, 1), 'count': 2})
+        self.assertEqual(sum(bucket['count'] for bucket in buckets), 3)
+        self.assertEqual(buckets[1]['count'], 0)
+
+    def test_weekly_curve_on_visit_date_with_rolling_average(self):
+        response = self.client.get(self.url, {'date_field': 'visit_date', 'district': 'Zomba', 'rolling': 2})
+        self.assertEqual([(b['period'], b['count'], b['rolling_average']) for b in response.data['buckets']], [
+            (datetime.date(2024, 1, 1), 2, 2.0),
+            (datetime.date(2024, 1, 8), 0, 1.0),
+            (datetime.date(2024, 1, 15), 1, 0.5),
+        ])
+
+    def test_monthly_curve_within_range(self):
+        response = self.client.get(self.url, {'interval': 'month', 'start': '2023-12-01', 'end': '2024-02-10'})
+        self.assertEqual([(b['period'], b['count']) for b in response.data['buckets']], [
+            (datetime.date(2023, 12, 1), 0),
+            (datetime.date(2024, 1, 1), 4),
+            (datetime.date(2024, 2, 1), 0),
+        ])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'interval': 'year'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'date_field': 'age'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'start': '2024-13-01'}).status_code, 400)
+        # '²' is a digit to str.isdigit() but not to int().
+        for rolling in ('0', '53', 'two', '\u00b2'):
+            response = self.client.get(self.url, {'rolling': rolling})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('rolling', response.data)
+
+    def test_long_and_out_of_range_spans_are_rejected(self):
+        response = self.client.get(self.url, {'interval': 'day', 'start': '0001-01-01', 'end': '9999-12-30'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('interval', response.data)
+        # Bounded by the cases on the open side.
+        self.assertEqual(self.client.get(self.url, {'interval': 'day', 'start': '2000-01-01'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'interval': 'month', 'start': '2000-01-01'}).status_code, 200)
+        for interval in ('day', 'week', 'month'):
+            response = self.client.get(self.url, {'interval': interval, 'start': '9999-12-01', 'end': '9999-12-31'})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('end', response.data)
@@ -0,0 +1,51 @@
+from core import rollups, search, summaries, tags
+from core.statistics import Counter
+from .models import Case
+
+# Counters returned by ``ClinicalCaseViewSet.statistics``, in response order.
+STATISTICS = {
+    'total_cases': Counter(),
+    'male_cases': Counter(sex='Male'),
+    'female_cases': Counter(sex='Female'),
+    'classification_prob': Counter(classification='Probable'),
+    'classification_conf': Counter(classification='Confirmed'),
+    'total_admission_status': Counter(),
+    'dis_admission_status': Counter(admission_status='Discharged'),
+    'out_admission_status': Counter(admission_status='Outpatient'),
+    'ref_admission_status': Counter(admission_status='Referred'),
+    'tem_vitals': Counter(vital_signs='Temperature'),
+    'pulse_vitals': Counter(vital_signs='Pulse'),
+    'respiratory_vitals': Counter(vital_signs='Respiratory Rate'),
+}
+
+# Fields accepted by ``?fields=`` on the ``distributions`` action.
+DISTRIBUTION_FIELDS = (
+    'district',
+    'sex',
+    'diagnosis',
+    'treatment',
+    'symptoms',
+    'disease',
+    'classification',
+    'admission_status',
+    'vital_signs',
+    'triage_level',
+    'procedures_done',
+    'lab_tests_ordered',
+)
+
+# Free-text fields searched by ``?q=``, patient_name first. The PostgreSQL
+# index is built from this list, so changing it needs a new migration.
+SEARCH_FIELDS = ('patient_name', 'symptoms', 'diagnosis', 'notes', 'lab_results_summary')
+
+# Comma-separated list fields counted per item, ``{field: m2m field}``.
+TAG_FIELDS = {
+    'symptoms': 'symptom_tags',
+    'lab_tests_ordered': 'lab_test_tags',
+    'procedures_done': 'procedure_tags',
+}
+
+rollups.register(Case, DISTRIBUTION_FIELDS)
+summaries.register(Case, DISTRIBUTION_FIELDS, STATISTICS)
+search.register(Case, SEARCH_FIELDS)
+tags.register(Case, TAG_FIELDS)
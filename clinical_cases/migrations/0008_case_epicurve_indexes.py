@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinical_cases', '0007_case_geohash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['disease', 'created_at'], name='clin_disease_created_idx'),
+        ),
+    ]
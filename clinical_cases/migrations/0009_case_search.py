@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from core import search
+
+install_search = search.install(
+    'clinical_cases_case', 'clin',
+    ('patient_name', 'symptoms', 'diagnosis', 'notes', 'lab_results_summary'),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clinical_cases', '0008_case_epicurve_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(*install_search),
+    ]
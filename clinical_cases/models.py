@@ -1,4 +1,5 @@
 from django.db import models
+from core.fields import GeohashField
 from users.models import User
 
 class Case(models.Model):
@@ -12,10 +13,15 @@ class Case(models.Model):
     age = models.IntegerField(null=True, blank=True)
     sex = models.CharField(max_length=10, blank=True)
     disease = models.CharField(max_length=200, blank=True)
+    classification = models.CharField(max_length=50, blank=True)
     notes = models.TextField(blank=True)    
     latitude = models.FloatField(null=True, blank=True)
     longitude = models.FloatField(null=True, blank=True)
+    geohash = GeohashField()
     created_at = models.DateTimeField(auto_now_add=True)   
+    updated_at = models.DateTimeField(auto_now=True)
+    # Client-generated key of offline-synced cases; see the bulk action.
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
     treatment = models.TextField(blank=True)
     diagnosis = models.TextField(blank=True)
     surveillance_notes = models.TextField(blank=True)
@@ -33,6 +39,32 @@ class Case(models.Model):
     discharge_notes = models.TextField(blank=True)
     follow_up_plan = models.TextField(blank=True)
   
+    # Normalized values of the comma-separated list fields; see core.tags.
+    symptom_tags = models.ManyToManyField('core.Tag', related_name='+', blank=True, editable=False)
+    lab_test_tags = models.ManyToManyField('core.Tag', related_name='+', blank=True, editable=False)
+    procedure_tags = models.ManyToManyField('core.Tag', related_name='+', blank=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['created_by', 'idempotency_key'],
+                condition=models.Q(idempotency_key__isnull=False),
+                name='clin_owner_idempotency_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['created_by', '-created_at'], name='clin_owner_created_idx'),
+            models.Index(fields=['created_by', 'updated_at'], name='clin_owner_updated_idx'),
+            models.Index(fields=['created_by', 'geohash'], name='clin_owner_geohash_idx'),
+            models.Index(fields=['disease', 'created_at'], name='clin_disease_created_idx'),
+            models.Index(fields=['created_by', 'district'], name='clin_owner_district_idx'),
+            models.Index(fields=['district', 'created_at'], name='clin_district_created_idx'),
+            models.Index(fields=['created_by', 'disease'], name='clin_owner_disease_idx'),
+            models.Index(fields=['created_by', 'sex'], name='clin_owner_sex_idx'),
+            models.Index(fields=['created_by', 'admission_status'], name='clin_owner_admission_idx'),
+            models.Index(fields=['created_by', 'triage_level'], name='clin_owner_triage_idx'),
+        ]
+
     def __str__(self):
         return f"{self.disease} - {self.patient_name or 'anon'}"
   
\ No newline at end of file
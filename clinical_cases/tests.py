@@ -0,0 +1,145 @@
+import json
+
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.testing import assert_queries_after_generation
+from users.models import User
+from .models import Case
+from .serializers import CaseSerializer
+
+
+@override_settings(ANALYTICS_CACHE=None)
+class StatisticsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='co', password='pass', role='CO')
+        self.client.force_authenticate(self.user)
+        Case.objects.create(created_by=self.user, sex='Male', classification='Confirmed', admission_status='Discharged', vital_signs='Pulse')
+        Case.objects.create(created_by=self.user, sex='Female', classification='Probable', admission_status='Referred')
+        Case.objects.create(created_by=None, sex='Male')
+
+    def test_statistics_is_a_single_query(self):
+        with assert_queries_after_generation(self, 1):
+            response = self.client.get(reverse('clinical_case-statistics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_cases'], 2)
+        self.assertEqual(response.data['male_cases'], 1)
+        self.assertEqual(response.data['classification_conf'], 1)
+        self.assertEqual(response.data['dis_admission_status'], 1)
+        self.assertEqual(response.data['pulse_vitals'], 1)
+        self.assertEqual(response.data['respiratory_vitals'], 0)
+
+
+@override_settings(ANALYTICS_CACHE=None)
+class DistributionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='co', password='pass', role='CO')
+        self.client.force_authenticate(self.user)
+        Case.objects.create(created_by=self.user, district='Lilongwe', sex='Male', triage_level='Red')
+        Case.objects.create(created_by=self.user, district='Lilongwe', sex='Female', triage_level='Green')
+        Case.objects.create(created_by=self.user, district='Blantyre', sex='Female', triage_level='Green')
+
+    def test_distributions_is_a_single_query(self):
+        with assert_queries_after_generation(self, 1):
+            response = self.client.get(reverse('clinical_case-distributions'), {'fields': 'district,sex,triage_level'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['district'], [
+            {'district': 'Blantyre', 'count': 1},
+            {'district': 'Lilongwe', 'count': 2},
+        ])
+        self.assertEqual(response.data['sex'], [
+            {'sex': 'Female', 'count': 2},
+            {'sex': 'Male', 'count': 1},
+        ])
+        self.assertEqual(list(response.data), ['district', 'sex', 'triage_level'])
+
+    def test_alias_matches_distributions(self):
+        alias = self.client.get(reverse('clinical_case-triage'))
+        combined = self.client.get(reverse('clinical_case-distributions'), {'fields': 'triage_level'})
+        self.assertEqual(alias.data, combined.data['triage_level'])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse('clinical_case-distributions'), {'fields': 'patient_name'})
+        self.assertEqual(response.status_code, 400)
+
+
+class IndexTests(TestCase):
+    def test_owner_queries_use_composite_indexes(self):
+        user = User.objects.create_user(username='co', password='pass', role='CO')
+        cases = Case.objects.filter(created_by=user)
+        self.assertIn('clin_owner_created_idx', cases.order_by('-created_at').explain())
+        self.assertIn('clin_owner_district_idx', cases.values('district').annotate(n=Count('pk')).order_by('district').explain())
+
+    def test_indexed_dimensions_keep_free_text_lengths(self):
+        serializer = CaseSerializer(data={'district': 'Zomba ' * 30, 'triage_level': 'Red ' * 20})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='co', password='pass', role='CO')
+        self.client.force_authenticate(self.user)
+        Case.objects.create(created_by=self.user, patient_name='Ada', district='Zomba', age=30)
+        Case.objects.create(created_by=self.user, patient_name='Ben, Jr.', district='Mzuzu')
+        self.url = reverse('clinical_case-export')
+
+    def test_csv_is_streamed(self):
+        response = self.client.get(self.url, {'fields': 'patient_name,age,district'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.splitlines(), ['patient_name,age,district', '"Ben, Jr.",,Mzuzu', 'Ada,30,Zomba'])
+
+    def test_ndjson_has_every_column_by_default(self):
+        response = self.client.get(self.url, {'output': 'ndjson'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        row = json.loads(lines[-1])
+        self.assertEqual(row['patient_name'], 'Ada')
+        self.assertIn('notes', row)
+        self.assertEqual(row['created_by'], self.user.pk)
+
+    def test_bad_output_is_rejected(self):
+        self.assertEqual(self.client.get(self.url, {'output': 'xml'}).status_code, 400)
+
+
+@override_settings(ANALYTICS_CACHE=None)
+class SearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='co', password='pass', role='CO')
+        self.client.force_authenticate(self.user)
+        self.fever = Case.objects.create(created_by=self.user, patient_name='Ada Banda', symptoms='fever, cough', district='Zomba')
+        self.rash = Case.objects.create(created_by=self.user, patient_name='Ben Phiri', symptoms='rash', notes='fever resolved', district='Mzuzu')
+        Case.objects.create(created_by=self.user, patient_name='Cy Mwale', lab_results_summary='malaria positive', district='Zomba')
+
+    def test_list_search_is_ranked(self):
+        response = self.client.get(reverse('clinical_case-list'), {'q': 'fever'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.fever.pk, self.rash.pk])
+        first = self.client.get(reverse('clinical_case-list'), {'q': 'fever', 'page_size': 1})
+        second = self.client.get(first.data['next'])
+        self.assertEqual([first.data['results'][0]['id'], second.data['results'][0]['id']], [self.fever.pk, self.rash.pk])
+
+    def test_prefix_terms_and_names(self):
+        response = self.client.get(reverse('clinical_case-list'), {'q': 'malar posit'})
+        self.assertEqual([row['patient_name'] for row in response.data['results']], ['Cy Mwale'])
+        response = self.client.get(reverse('clinical_case-list'), {'q': 'banda'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.fever.pk])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.client.patch(reverse('clinical_case-detail', args=[self.rash.pk]), {'notes': ''})
+        self.client.delete(reverse('clinical_case-detail', args=[self.fever.pk]))
+        response = self.client.get(reverse('clinical_case-list'), {'q': 'fever'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_analytics_are_narrowed_by_q(self):
+        response = self.client.get(reverse('clinical_case-by-district'), {'q': 'fever'})
+        self.assertEqual(response.data, [{'district': 'Mzuzu', 'count': 1}, {'district': 'Zomba', 'count': 1}])
+        response = self.client.get(reverse('clinical_case-statistics'), {'q': 'cough'})
+        self.assertEqual(response.data['total_cases'], 1)
+
+    def test_bulk_created_cases_are_searchable(self):
+        self.client.post(reverse('clinical_case-bulk'), [{'symptoms': 'diarrhoea'}], format='json')
+        response = self.client.get(reverse('clinical_case-list'), {'q': 'diarrhoea'})
+        self.assertEqual(len(response.data['results']), 1)
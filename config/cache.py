@@ -0,0 +1,43 @@
+"""
+``CACHES`` built from the environment.
+
+``CACHE_URL`` selects a cache shared by all processes:
+``redis://host:6379/0`` (or ``rediss://``, needs ``redis``) or
+``memcached://host:11211`` (needs ``pymemcache``). Without it the
+``default`` alias is a per-process local memory cache, and the caches that
+must agree across processes, the analytics response cache and the JWT user
+cache, are left off.
+"""
+from urllib.parse import urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+REDIS_SCHEMES = ('redis', 'rediss')
+MEMCACHED_SCHEMES = ('memcached', 'pymemcache')
+# Backends whose entries are only seen by the process that wrote them.
+LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache(url):
+    """Settings of one cache alias from its URL."""
+    parts = urlsplit(url)
+    if parts.scheme in REDIS_SCHEMES:
+        return {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': url}
+    if parts.scheme in MEMCACHED_SCHEMES:
+        return {'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache', 'LOCATION': parts.netloc}
+    raise ImproperlyConfigured(f'Unsupported cache URL scheme {parts.scheme!r}.')
+
+
+def caches(environ):
+    url = environ.get('CACHE_URL')
+    if not url:
+        return {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    return {'default': cache(url)}
+
+
+def shared(config):
+    """Whether the ``CACHES`` entry ``config`` is seen by every process."""
+    return config['BACKEND'] not in LOCAL_BACKENDS
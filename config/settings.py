@@ -10,8 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import importlib.util
+import os
 from pathlib import Path
 
+from .cache import caches, shared
+from .database import databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,6 +46,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'corsheaders',
     'users',
+    'core',
     'hso_cases',
     'chw_cases',
     'clinical_cases',  
@@ -57,13 +63,102 @@ CORS_ALLOW_CREDENTIALS = True
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
+    ),
+    # Chosen through the Accept header (or ?format=), see core/renderers.py.
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'core.renderers.ColumnarJSONRenderer',
+        *(('core.renderers.MessagePackRenderer',) if importlib.util.find_spec('msgpack') else ()),
     ),
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.CaseCursorPagination',
+    'PAGE_SIZE': 50,
 }
 
+# Shared (Redis/Memcached) when CACHE_URL is set, per process otherwise;
+# see config/cache.py.
+CACHES = caches(os.environ)
+
+# Cache alias and lifetime (seconds) of the users authenticated by JWT, see
+# users.authentication. Only used when the alias is shared (CACHE_URL).
+AUTH_USER_CACHE = 'default'
+AUTH_USER_CACHE_TIMEOUT = 300
+
+# Response compression (core.middleware.CompressionMiddleware): smallest
+# body worth compressing, and the gzip level and brotli quality used.
+COMPRESSION_MIN_SIZE = 512
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 4
+
+# Upper bound for ?page_size= on the case lists.
+CASE_PAGE_SIZE_MAX = 500
+
+# POST .../bulk/ limits: items per request and rows per INSERT.
+CASE_BULK_MAX_ITEMS = 5000
+CASE_BULK_CHUNK_SIZE = 500
+
+# Rows fetched per round trip by the streaming export.
+CASE_EXPORT_CHUNK_SIZE = 2000
+
+# Delta sync for offline clients (see core/sync.py): rows per response,
+# seconds of recent changes held back until the next sync, and days
+# tombstones of deleted cases are kept (older watermarks force a reset).
+CASE_SYNC_PAGE_SIZE = 500
+CASE_SYNC_LAG = 10
+CASE_SYNC_TOMBSTONE_DAYS = 90
+
 AUTH_USER_MODEL = 'users.User'
 
+# Programs whose cases a role reads in its assigned districts, on top of
+# the user's own cases (see core/scoping.py). Staff read every case.
+CASE_SCOPE_PROGRAMS = {
+    'CHW': ('chw_cases',),
+    'CO': ('clinical_cases', 'chw_cases'),
+    'HSO': ('clinical_cases', 'chw_cases', 'hso_cases'),
+}
+
+# Serve statistics/distributions from core.CaseRollup instead of raw cases.
+# Run `manage.py rebuild_rollups` once before turning this on.
+ANALYTICS_USE_ROLLUPS = False
+
+# Serve /api/dashboard/ from core.UserDashboardSummary (see core/summaries.py).
+# Run `manage.py rebuild_dashboard_summaries` once before turning this on.
+DASHBOARD_USE_SUMMARIES = False
+
+# Response cache for the analytics actions (see core/cache.py). It is kept
+# in the shared cache, and off without one: a per-process cache would keep
+# serving responses older than writes handled by other processes.
+ANALYTICS_CACHE = {
+    'BACKEND': 'core.cache.DjangoCacheBackend',
+    'OPTIONS': {'alias': 'default', 'timeout': 300},
+} if shared(CACHES['default']) else None
+
+# Request metrics (see core/metrics.py): samples kept per endpoint for the
+# p50/p95/p99, and the bearer token required by /metrics. Without a token
+# /metrics is only served with DEBUG.
+METRICS_WINDOW = 1024
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Threads (each with its own database connection) running the panels of
+# /api/analytics/dashboard/ concurrently; 0 runs them one after another.
+ANALYTICS_DASHBOARD_THREADS = 4
+
+# Background jobs (see core/jobs.py, manage.py run_workers): worker
+# processes, seconds between polls of an idle queue, jobs running at once
+# per user and per kind (export, epicurve), jobs a user may have waiting
+# (more are refused with 429), and seconds after which a running job is
+# considered lost.
+JOBS_PROCESSES = 2
+JOBS_POLL_INTERVAL = 1.0
+JOBS_MAX_PER_USER = 2
+JOBS_MAX_QUEUED_PER_USER = 10
+JOBS_MAX_PER_KIND = {'export': 2, 'epicurve': 4}
+JOBS_TIMEOUT = 3600
+
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -97,13 +192,16 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database  
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# PostgreSQL when DATABASE_URL is set, SQLite otherwise; see config/database.py.
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+DATABASES = databases(os.environ, BASE_DIR)
+
+# Analytics actions read from this alias when it is configured
+# (DATABASE_REPLICA_URL), except for ANALYTICS_REPLICA_LAG seconds after a
+# write to the program.
+DATABASE_ROUTERS = ['core.routers.AnalyticsReplicaRouter']
+ANALYTICS_DATABASE = 'replica'
+ANALYTICS_REPLICA_LAG = 5
 
 
 # Password validation
@@ -142,6 +240,9 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded and generated files, e.g. the results of background jobs.
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', BASE_DIR / 'media')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
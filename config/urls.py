@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from core.views import prometheus_metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
 
@@ -11,5 +13,11 @@ urlpatterns = [
     path('api/', include('hso_cases.urls')),
     path('api/', include('chw_cases.urls')),
     path('api/', include('clinical_cases.urls')),
+
+    # Cross-program analytics and monitoring
+    path('api/', include('core.urls')),
+
+    # Prometheus scrape endpoint
+    path('metrics', prometheus_metrics, name='prometheus_metrics'),
 ]
          
\ No newline at end of file
@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+
+    def ready(self):
+        # Case apps register their rollup dimensions in analytics.py.
+        autodiscover_modules('analytics')
+
+        from django.db.backends.signals import connection_created
+        from . import metrics
+        connection_created.connect(metrics.install, dispatch_uid='core.metrics.install')
@@ -0,0 +1,184 @@
+"""
+API benchmark scenarios run through the DRF test client.
+
+``scenarios()`` discovers every case viewset from the URLconf and times
+its list (plain and searched), detail, create and bulk endpoints plus
+every ``detail=False`` GET action, and the cross-program analytics view.
+Each scenario is requested once untimed to record its status, SQL query
+count and response size, then ``repeat`` times for the timings. Results
+are plain dicts, written as JSON by ``manage.py benchmark`` and compared
+between commits with ``compare()``. ``encodings()`` measures the size and
+encode time of the list, distributions and sync responses in every
+response format and compression.
+"""
+import re
+import statistics
+import time
+
+from django.urls import reverse
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+
+from . import synthetic
+from .dashboard import case_viewsets
+from .middleware import CompressionMiddleware
+
+BULK_ITEMS = 100
+
+SERVER_TIMING_DB = re.compile(r'db;dur=(?P<ms>[\d.]+);desc="(?P<queries>\d+) queries"')
+SERVER_TIMING_SERIALIZE = re.compile(r'serialize;dur=(?P<ms>[\d.]+)')
+
+# Actions whose responses ``encodings()`` measures.
+ENCODING_ACTIONS = ('list', 'distributions', 'sync')
+
+# Query parameters of actions that need some to do real work.
+ACTION_PARAMS = {
+    'map': {'bbox': '32.6,-17.2,36.0,-9.3', 'zoom': '7'},
+}
+
+
+class Scenario:
+    def __init__(self, name, user, method, path, data=None, params=None):
+        self.name = name
+        self.user = user
+        self.method = method
+        self.path = path
+        self.data = data
+        self.params = params or {}
+
+    def request(self, client, **headers):
+        client.force_authenticate(self.user)
+        if self.method == 'post':
+            response = client.post(
+                self.path, self.data() if callable(self.data) else self.data, format='json', **headers,
+            )
+        else:
+            response = client.get(self.path, self.params, **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return response, len(body)
+
+
+def scenarios(users):
+    """Scenarios of every case viewset; ``users`` maps program to the user to act as."""
+    found = []
+    for basename, viewset in sorted(case_viewsets().items()):
+        model = viewset.queryset.model
+        program = model._meta.app_label
+        user = users[program]
+        factory = synthetic.CaseFactory(program, [user], seed='benchmark')
+        case_id = model.objects.filter(created_by=user).order_by('pk').values_list('pk', flat=True).first()
+        found += [
+            Scenario(f'{basename}.list', user, 'get', reverse(f'{basename}-list')),
+            Scenario(f'{basename}.list_search', user, 'get', reverse(f'{basename}-list'), params={'q': 'fever'}),
+            Scenario(f'{basename}.create', user, 'post', reverse(f'{basename}-list'), data=factory.payload),
+            Scenario(f'{basename}.bulk', user, 'post', reverse(f'{basename}-bulk'),
+                     data=lambda factory=factory: [factory.payload() for _ in range(BULK_ITEMS)]),
+        ]
+        if case_id is not None:
+            found.append(Scenario(f'{basename}.retrieve', user, 'get', reverse(f'{basename}-detail', args=[case_id])))
+        for extra in viewset.get_extra_actions():
+            if extra.detail or 'get' not in extra.mapping:
+                continue
+            found.append(Scenario(
+                f'{basename}.{extra.__name__}', user, 'get', reverse(f'{basename}-{extra.url_name}'),
+                params=ACTION_PARAMS.get(extra.__name__),
+            ))
+    if users:
+        found.append(Scenario('cross_program_analytics', next(iter(users.values())), 'get',
+                              reverse('cross_program_analytics')))
+    return found
+
+
+def run(scenarios, repeat=5):
+    """Time ``scenarios``; returns ``{name: result}``."""
+    client = APIClient()
+    results = {}
+    for scenario in scenarios:
+        response, size = scenario.request(client)
+        # Reported by RequestMetricsMiddleware, including queries made in other threads.
+        timing = SERVER_TIMING_DB.search(response.get('Server-Timing', ''))
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            scenario.request(client)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results[scenario.name] = {
+            'method': scenario.method.upper(),
+            'path': scenario.path,
+            'status': response.status_code,
+            'queries': int(timing['queries']) if timing else None,
+            'db_ms': float(timing['ms']) if timing else None,
+            'bytes': size,
+            'runs': repeat,
+            'min_ms': round(timings[0], 3),
+            'median_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+        }
+    return results
+
+
+def response_formats():
+    """``{format: media type}`` of the registered renderers, without the browsable API."""
+    return {
+        renderer.format: renderer.media_type
+        for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+        if renderer.format != 'api'
+    }
+
+
+def encodings(scenarios, repeat=5):
+    """
+    Bytes on the wire and encode time of the GET ``ENCODING_ACTIONS``
+    scenarios, for every response format and content encoding.
+
+    The encode time is the ``serialize`` entry of ``Server-Timing``:
+    serializers, rendering and compression. Returns ``{name: result}``
+    with names like ``chw_case.list.msgpack.br``.
+    """
+    client = APIClient()
+    results = {}
+    for scenario in scenarios:
+        if scenario.method != 'get' or scenario.name.rpartition('.')[2] not in ENCODING_ACTIONS:
+            continue
+        for response_format, media_type in response_formats().items():
+            for encoding in ('identity', *CompressionMiddleware.available_encodings()):
+                headers = {'HTTP_ACCEPT': media_type, 'HTTP_ACCEPT_ENCODING': encoding}
+                timings = []
+                for _ in range(repeat):
+                    response, size = scenario.request(client, **headers)
+                    timing = SERVER_TIMING_SERIALIZE.search(response.get('Server-Timing', ''))
+                    timings.append(float(timing['ms']) if timing else 0.0)
+                results[f'{scenario.name}.{response_format}.{encoding}'] = {
+                    'status': response.status_code,
+                    'content_type': response.get('Content-Type'),
+                    'content_encoding': response.get('Content-Encoding', 'identity'),
+                    'bytes': size,
+                    'encode_ms': round(statistics.median(timings), 3),
+                }
+    return results
+
+
+def compare(baseline, current, threshold=1.25, min_delta_ms=1.0):
+    """
+    Regressions of ``current`` against ``baseline`` results.
+
+    A scenario regresses when its median grows by more than ``threshold``
+    times and ``min_delta_ms``, or when it issues more queries. Returns a
+    list of ``(size, scenario, message)``.
+    """
+    regressions = []
+    for size, results in current['sizes'].items():
+        before = baseline.get('sizes', {}).get(size, {})
+        for name, result in results.items():
+            if name not in before:
+                continue
+            old, new = before[name], result
+            if (new['queries'] or 0) > (old['queries'] or 0):
+                regressions.append((size, name, f"queries {old['queries']} -> {new['queries']}"))
+            delta = new['median_ms'] - old['median_ms']
+            if delta > min_delta_ms and new['median_ms'] > old['median_ms'] * threshold:
+                regressions.append((size, name, f"median {old['median_ms']:.1f}ms -> {new['median_ms']:.1f}ms"))
+    return regressions
@@ -0,0 +1,219 @@
+"""
+Versioned response cache for the analytics actions.
+
+Entries are keyed by (program, generation, user, action, query params).
+Every case write bumps the program's generation once its transaction
+commits, which makes all older entries of that program unreachable
+without having to enumerate them. Generations start from the current time
+rather than 0, so a restarted process or an evicted counter never reuses
+the generation of older entries (or of ETags, see ``core.conditional``).
+
+The backend is configured like ``CACHES``::
+
+    ANALYTICS_CACHE = {
+        'BACKEND': 'core.cache.DjangoCacheBackend',
+        'OPTIONS': {'alias': 'default', 'timeout': 300},
+    }
+
+``ANALYTICS_CACHE = None`` disables caching. Generations are only bumped
+in the cache of the process handling the write, so with several processes
+the backend must be shared: ``DjangoCacheBackend`` on a Redis or Memcached
+alias. ``LocMemLRUBackend`` suits a single process; its entries also
+expire after ``timeout`` seconds, which bounds how stale they can get.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+def _seed():
+    return time.time_ns()
+
+
+class BaseBackend:
+    # Whether every process sees the same entries and generations.
+    shared = False
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def generation(self, namespace):
+        raise NotImplementedError
+
+    def bump(self, namespace):
+        raise NotImplementedError
+
+    def written_at(self, namespace):
+        """``time.time()`` of the latest bump of ``namespace``, or ``None``."""
+        raise NotImplementedError
+
+    def stats(self):
+        return {'backend': type(self).__name__, 'hits': self.hits, 'misses': self.misses}
+
+
+class LocMemLRUBackend(BaseBackend):
+    """Per-process cache holding at most ``max_entries`` responses for ``timeout`` seconds."""
+
+    def __init__(self, max_entries=2048, timeout=300):
+        super().__init__()
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._written = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            expires, value = self._entries[key]
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, namespace):
+        with self._lock:
+            return self._generations.setdefault(namespace, _seed())
+
+    def bump(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, _seed()) + 1
+            self._written[namespace] = time.time()
+
+    def written_at(self, namespace):
+        with self._lock:
+            return self._written.get(namespace)
+
+    def stats(self):
+        return {
+            **super().stats(), 'entries': len(self._entries), 'max_entries': self.max_entries,
+            'timeout': self.timeout,
+        }
+
+
+class DjangoCacheBackend(BaseBackend):
+    """Stores responses and generations in one of the ``CACHES`` aliases."""
+
+    def __init__(self, alias='default', timeout=300):
+        super().__init__()
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def shared(self):
+        return not isinstance(self.cache, (LocMemCache, DummyCache))
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+
+    def _generation_key(self, namespace):
+        return f'analytics-generation:{namespace}'
+
+    def generation(self, namespace):
+        return self.cache.get_or_set(self._generation_key(namespace), _seed, None)
+
+    def bump(self, namespace):
+        key = self._generation_key(namespace)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, _seed(), None)
+        self.cache.set(self._written_key(namespace), time.time(), None)
+
+    def _written_key(self, namespace):
+        return f'analytics-written:{namespace}'
+
+    def written_at(self, namespace):
+        return self.cache.get(self._written_key(namespace))
+
+    def stats(self):
+        return {**super().stats(), 'alias': self.alias, 'shared': self.shared}
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The configured backend, or ``None`` when caching is disabled."""
+    global _backend
+    config = getattr(settings, 'ANALYTICS_CACHE', None)
+    if not config or not config.get('BACKEND'):
+        return None
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend_class = import_string(config['BACKEND'])
+                _backend = backend_class(**config.get('OPTIONS', {}))
+    return _backend
+
+
+@receiver(setting_changed)
+def _reset_backend(setting, **kwargs):
+    global _backend
+    if setting == 'ANALYTICS_CACHE':
+        _backend = None
+
+
+def query_string(params):
+    """``params`` in a canonical order."""
+    return '&'.join(f'{name}={value}' for name, values in sorted(params.lists()) for value in values)
+
+
+def make_key(backend, namespace, user_id, action, params):
+    digest = hashlib.sha1(query_string(params).encode()).hexdigest()
+    generation = backend.generation(namespace)
+    return f'analytics:{namespace}:{generation}:{user_id}:{action}:{digest}'
+
+
+def lookup(backend, key):
+    value = backend.get(key)
+    if value is None:
+        backend.misses += 1
+    else:
+        backend.hits += 1
+    return value
+
+
+def invalidate(namespace):
+    backend = get_backend()
+    if backend is not None:
+        backend.bump(namespace)
+
+
+def stats():
+    backend = get_backend()
+    return backend.stats() if backend is not None else {'backend': None}
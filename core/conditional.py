@@ -0,0 +1,65 @@
+"""
+Validators for conditional GETs of the case APIs.
+
+A response is identified by the generation of its program: a counter in
+``ProgramGeneration`` that every case write bumps in its own transaction,
+so it is seen by every process and commits (or rolls back) with the
+write. Reading it is one primary-key lookup, whatever the number of cases.
+
+The ETag hashes the generation (or the analytics cache generation, for
+the cached analytics actions with a shared cache) with everything else
+the response depends on: scope, action, object, query parameters and the
+negotiated format. ``Last-Modified`` is the time of the program's latest
+write. Both are per program, so a write to any case of the program
+revalidates every response of it.
+"""
+import hashlib
+from functools import partial
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import cache
+from .models import ProgramGeneration
+
+# Part of every ETag; bump it when the shape of the responses changes.
+VERSION = 1
+
+
+def generation(program):
+    """``(generation, updated_at)`` of ``program``; ``(0, None)`` before its first write."""
+    try:
+        return ProgramGeneration.objects.values_list('generation', 'updated_at').get(pk=program)
+    except ProgramGeneration.DoesNotExist:
+        return 0, None
+
+
+def bump(program):
+    """Move ``program``'s generation; call it in the transaction of the write."""
+    now = timezone.now()
+    generations = ProgramGeneration.objects.filter(pk=program)
+    if generations.update(generation=F('generation') + 1, updated_at=now):
+        return
+    try:
+        with transaction.atomic():
+            ProgramGeneration.objects.create(program=program, generation=1, updated_at=now)
+    except IntegrityError:
+        # Created by a concurrent write meanwhile.
+        generations.update(generation=F('generation') + 1, updated_at=now)
+
+
+def cases_changed(program):
+    """
+    Revalidate every response of ``program`` after a write to its cases or
+    to the tables derived from them: bump its generation now and its
+    analytics cache generation once the transaction commits.
+    """
+    bump(program)
+    transaction.on_commit(partial(cache.invalidate, program))
+
+
+def make_etag(state, *parts):
+    """Quoted strong ETag of ``state`` (a generation) and the other ``parts``."""
+    digest = hashlib.sha1('|'.join(map(str, (VERSION, state, *parts))).encode()).hexdigest()
+    return f'"{digest[:32]}"'
@@ -0,0 +1,138 @@
+"""
+Combined analytics dashboard with its panels computed concurrently.
+
+A dashboard shows, for each program, the case count, the statistics, the
+distributions, the epidemic curve and the latest cases. These are
+independent queries: ``AnalyticsDashboardView`` runs them at the same time
+instead of one after another. The aggregations are computed by the case
+viewsets themselves (same scoping, ``?q=`` search, rollups and replica
+routing as their actions) on a pool of ``ANALYTICS_DASHBOARD_THREADS``
+threads, each holding its own database connection; the count and the
+latest cases use the async ORM directly. With the setting at 0 every
+panel runs on the request's thread, one after another.
+"""
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from . import routers
+from .mixins import AnalyticsMixin
+
+RECENT_FIELDS = ('id', 'created_at', 'patient_name', 'disease', 'district', 'classification')
+
+_executor = None
+_executor_threads = None
+_executor_lock = threading.Lock()
+
+
+def case_viewsets():
+    """``{basename: viewset}`` of every routed case viewset."""
+    found = {}
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and (pattern.name or '').endswith('-list'):
+                viewset = getattr(pattern.callback, 'cls', None)
+                if viewset is not None and issubclass(viewset, AnalyticsMixin):
+                    found[pattern.name[:-len('-list')]] = viewset
+
+    walk(get_resolver().url_patterns)
+    return found
+
+
+def program_viewsets():
+    """``{program: viewset}`` of every routed case viewset."""
+    return {viewset.queryset.model._meta.app_label: viewset for viewset in case_viewsets().values()}
+
+
+def _get_executor(threads):
+    global _executor, _executor_threads
+    with _executor_lock:
+        if _executor is None or _executor_threads != threads:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='dashboard')
+            _executor_threads = threads
+        return _executor
+
+
+def _in_worker(function):
+    # Worker threads outlive requests: apply CONN_MAX_AGE and health checks
+    # around each task the way request_started/request_finished do.
+    close_old_connections()
+    try:
+        return function()
+    finally:
+        close_old_connections()
+
+
+async def run_sync(function):
+    """Run ``function`` on a dashboard worker thread, or on the request's thread."""
+    threads = getattr(settings, 'ANALYTICS_DASHBOARD_THREADS', 4)
+    if not threads:
+        return await sync_to_async(function)()
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(threads), context.run, _in_worker, function)
+
+
+class ProgramPanels:
+    """The dashboard panels of one program, computed by its viewset."""
+
+    def __init__(self, viewset_class, request, fields=None, recent=10):
+        self.view = viewset_class(action='dashboard', format_kwarg=None, args=(), kwargs={})
+        self.view.request = request
+        self.program = self.view.get_program()
+        self.fields = [field for field in (fields or self.view.distribution_fields)
+                       if field in self.view.distribution_fields]
+        self.recent = recent
+
+    def _analytics(self, function, *args):
+        def panel():
+            with routers.analytics_reads(self.program):
+                return function(*args)
+        return run_sync(panel)
+
+    async def total(self):
+        with routers.analytics_reads(self.program):
+            return await self.view.analytics_cases().acount()
+
+    async def latest(self):
+        cases = self.view.analytics_cases().order_by('-created_at', '-id').values(*RECENT_FIELDS)
+        with routers.analytics_reads(self.program):
+            return [case async for case in cases[:self.recent].aiterator()]
+
+    def epicurve(self):
+        return self.view.epicurve(self.view.request).data
+
+    async def compute(self):
+        total, statistics, distributions, epicurve, latest = await asyncio.gather(
+            self.total(),
+            self._analytics(self.view.get_statistics),
+            self._analytics(self.view.get_distributions, self.fields),
+            self._analytics(self.epicurve),
+            self.latest(),
+        )
+        return {
+            'total': total,
+            'statistics': statistics,
+            'distributions': distributions,
+            'epicurve': epicurve,
+            'latest': latest,
+        }
+
+
+async def build(request, programs, fields=None, recent=10):
+    """``{program: panels}`` for ``programs``, every panel of every program at once."""
+    viewsets = program_viewsets()
+    panels = [ProgramPanels(viewsets[program], request, fields, recent) for program in programs]
+    results = await asyncio.gather(*(program.compute() for program in panels))
+    return {program.program: result for program, result in zip(panels, results)}
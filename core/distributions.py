@@ -0,0 +1,81 @@
+"""
+Multi-field histograms computed from a single scan of the case table.
+
+On PostgreSQL every requested field is grouped in one statement with
+GROUPING SETS. Other backends group by all requested fields at once and
+the per-field histograms are summed up from that joint histogram.
+
+Fields registered in ``core.tags`` are counted per tag instead, with one
+join through their tag table each.
+"""
+from collections import Counter as Tally
+
+from django.db import connections
+from django.db.models import Count
+
+from . import tags
+
+
+def _sort_key(item):
+    value = item[0]
+    return (value is None, value)
+
+
+def _grouping_sets(queryset, fields):
+    connection = connections[queryset.db]
+    qn = connection.ops.quote_name
+    columns = [qn(queryset.model._meta.get_field(field).column) for field in fields]
+    inner, params = queryset.order_by().values(*fields).query.sql_with_params()
+    sql = 'SELECT {cols}, {flags}, COUNT(*) FROM ({inner}) AS cases GROUP BY GROUPING SETS ({sets})'.format(
+        cols=', '.join(columns),
+        flags=', '.join(f'GROUPING({column})' for column in columns),
+        inner=inner,
+        sets=', '.join(f'({column})' for column in columns),
+    )
+    tallies = {field: Tally() for field in fields}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for row in cursor.fetchall():
+            values, flags, count = row[:len(fields)], row[len(fields):-1], row[-1]
+            index = flags.index(0)
+            tallies[fields[index]][values[index]] += count
+    return tallies
+
+
+def _joint_group_by(queryset, fields):
+    tallies = {field: Tally() for field in fields}
+    rows = queryset.order_by().values_list(*fields).annotate(count=Count('pk'))
+    for *values, count in rows:
+        for field, value in zip(fields, values):
+            tallies[field][value] += count
+    return tallies
+
+
+def compute_distributions(queryset, fields):
+    """
+    Return ``{field: [{field: value, 'count': n}, ...]}`` for every field.
+
+    Each list is ordered by value, matching ``values(field).annotate(...)
+    .order_by(field)``. Plain fields share one query whatever their number;
+    each tagged field adds one.
+    """
+    fields = list(dict.fromkeys(fields))
+    tagged = [field for field in fields if tags.tag_field(queryset.model, field)]
+    plain = [field for field in fields if field not in tagged]
+    tallies = {field: Tally(tags.histogram(queryset, field)) for field in tagged}
+    if plain and connections[queryset.db].vendor == 'postgresql':
+        tallies.update(_grouping_sets(queryset, plain))
+    elif plain:
+        tallies.update(_joint_group_by(queryset, plain))
+    return format_histograms(tallies, fields)
+
+
+def format_histograms(tallies, fields):
+    """Render ``{field: Counter}`` tallies in the distribution response shape."""
+    return {
+        field: [
+            {field: value, 'count': count}
+            for value, count in sorted(tallies[field].items(), key=_sort_key)
+        ]
+        for field in fields
+    }
@@ -0,0 +1,94 @@
+"""
+Epidemic curve bucketing.
+
+Counts are bucketed in the database with ``Trunc`` and gaps between
+buckets are filled with zeros in Python, so the number of rows fetched is
+at most the number of non-empty periods.
+"""
+import datetime
+
+from django.db.models import Count, DateField, DateTimeField
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+INTERVALS = ('day', 'week', 'month')
+
+
+def period_start(day, interval):
+    """First day of the ``interval`` containing ``day`` (ISO weeks start on Monday)."""
+    if interval == 'week':
+        return day - datetime.timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_period(day, interval):
+    if interval == 'week':
+        return day + datetime.timedelta(weeks=1)
+    if interval == 'month':
+        return (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return day + datetime.timedelta(days=1)
+
+
+def period_count(start, end, interval):
+    """Number of periods from the one containing ``start`` to the one containing ``end``."""
+    if interval == 'month':
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    days = (period_start(end, interval) - period_start(start, interval)).days
+    return (days // 7 if interval == 'week' else days) + 1
+
+
+def date_range_filter(model, date_field, start=None, end=None):
+    """Index-friendly lookups restricting ``date_field`` to ``[start, end]``."""
+    lookups = {}
+    is_datetime = isinstance(model._meta.get_field(date_field), DateTimeField)
+    if start is not None:
+        lookups[f'{date_field}__gte'] = (
+            timezone.make_aware(datetime.datetime.combine(start, datetime.time.min)) if is_datetime else start
+        )
+    if end is not None:
+        end = end + datetime.timedelta(days=1)
+        lookups[f'{date_field}__lt'] = (
+            timezone.make_aware(datetime.datetime.combine(end, datetime.time.min)) if is_datetime else end
+        )
+    return lookups
+
+
+def bucket_counts(queryset, date_field, interval):
+    """``{period_start: count}`` for the non-empty periods."""
+    rows = (
+        queryset
+        .filter(**{f'{date_field}__isnull': False})
+        .annotate(period=Trunc(date_field, interval, output_field=DateField()))
+        .values_list('period')
+        .annotate(count=Count('pk'))
+        .order_by('period')
+    )
+    return dict(rows)
+
+
+def fill_gaps(counts, interval, start=None, end=None):
+    """``[(period_start, count)]`` for every period from ``start`` to ``end``."""
+    if start is None or end is None:
+        if not counts:
+            return []
+        start = start or min(counts)
+        end = end or max(counts)
+    series = []
+    period = period_start(start, interval)
+    while period <= end:
+        series.append((period, counts.get(period, 0)))
+        period = next_period(period, interval)
+    return series
+
+
+def rolling_average(values, window):
+    """Trailing mean over ``window`` values (fewer at the start of the series)."""
+    averages, total = [], 0
+    for index, value in enumerate(values):
+        total += value
+        if index >= window:
+            total -= values[index - window]
+        averages.append(round(total / min(index + 1, window), 2))
+    return averages
@@ -0,0 +1,34 @@
+"""
+Row generators for the streaming case export.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` (a
+server-side cursor on PostgreSQL) and encoded one at a time, so memory
+use does not depend on the number of exported cases.
+"""
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the value back to ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+def _rows(queryset, columns, chunk_size):
+    return queryset.values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+def iter_csv(queryset, columns, chunk_size=2000):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in _rows(queryset, columns, chunk_size):
+        yield writer.writerow(['' if value is None else value for value in row])
+
+
+def iter_ndjson(queryset, columns, chunk_size=2000):
+    encoder = DjangoJSONEncoder()
+    for row in _rows(queryset, columns, chunk_size):
+        yield encoder.encode(dict(zip(columns, row))) + '\n'
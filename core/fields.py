@@ -0,0 +1,50 @@
+from django.db import models
+
+from . import geo
+
+
+class GeohashField(models.CharField):
+    """
+    Geohash of the instance's latitude/longitude, recomputed on every save.
+
+    Computed in ``pre_save`` so it is also filled by ``bulk_create``.
+    Empty when either coordinate is missing. On PostgreSQL the column uses
+    the "C" collation: the map filters on prefix ranges, which need values
+    compared byte by byte (as SQLite does) to match and to use the index.
+    """
+
+    def __init__(self, *args, latitude_field='latitude', longitude_field='longitude', **kwargs):
+        self.latitude_field = latitude_field
+        self.longitude_field = longitude_field
+        kwargs.setdefault('max_length', geo.MAX_PRECISION)
+        kwargs.setdefault('blank', True)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.latitude_field != 'latitude':
+            kwargs['latitude_field'] = self.latitude_field
+        if self.longitude_field != 'longitude':
+            kwargs['longitude_field'] = self.longitude_field
+        return name, path, args, kwargs
+
+    def db_parameters(self, connection):
+        parameters = super().db_parameters(connection)
+        if connection.vendor == 'postgresql' and not self.db_collation:
+            parameters['collation'] = 'C'
+        return parameters
+
+    def compute(self, instance):
+        latitude = getattr(instance, self.latitude_field)
+        longitude = getattr(instance, self.longitude_field)
+        if latitude is None or longitude is None:
+            return ''
+        return geo.encode(latitude, longitude, self.max_length)
+
+    def pre_save(self, model_instance, add):
+        value = self.compute(model_instance)
+        setattr(model_instance, self.attname, value)
+        return value
+
@@ -0,0 +1,16 @@
+from rest_framework.filters import BaseFilterBackend
+
+from . import search
+
+
+class CaseSearchFilter(BaseFilterBackend):
+    """
+    ``?q=`` full-text search over the registered case fields, best match first.
+    """
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param)
+        if not query:
+            return queryset
+        return search.search(queryset, query)
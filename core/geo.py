@@ -0,0 +1,77 @@
+"""
+Geohash helpers for the case map.
+
+A geohash interleaves longitude and latitude bits into a base32 string;
+every extra character narrows the cell, and all points of a cell share
+its prefix. That makes a plain string index usable both for bounding-box
+filters (prefix ranges) and for clustering (grouping on a prefix).
+"""
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+MAX_PRECISION = 12
+
+# Geohash length giving cells of roughly one map tile per zoom level.
+ZOOM_PRECISION = [1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4, 5, 5, 5, 6, 6, 6, 7, 7, 7, 8, 8, 8]
+
+
+def encode(latitude, longitude, precision=9):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        bounds, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (bounds[0] + bounds[1]) / 2
+        if coordinate >= middle:
+            value = (value << 1) | 1
+            bounds[0] = middle
+        else:
+            value <<= 1
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """``(height, width)`` in degrees of a cell of ``precision`` characters."""
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 - lon_bits
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def precision_for_zoom(zoom):
+    return ZOOM_PRECISION[max(0, min(zoom, len(ZOOM_PRECISION) - 1))]
+
+
+def covering_cells(south, west, north, east, precision):
+    """Geohashes of ``precision`` characters intersecting the bounding box."""
+    height, width = cell_size(precision)
+    cells = []
+    row = math.floor((south + 90) / height)
+    while row * height - 90 <= north and row * height - 90 < 90:
+        column = math.floor((west + 180) / width)
+        while column * width - 180 <= east and column * width - 180 < 180:
+            cells.append(encode(row * height - 90 + height / 2, column * width - 180 + width / 2, precision))
+            column += 1
+        row += 1
+    return cells
+
+
+def covering_prefixes(south, west, north, east, max_cells=32):
+    """
+    The finest set of at most ``max_cells`` geohash prefixes covering the box.
+
+    Returns an empty list when only the whole world covers it.
+    """
+    for precision in range(MAX_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        estimate = ((north - south) / height + 2) * ((east - west) / width + 2)
+        if estimate > max_cells * 4:
+            continue
+        cells = covering_cells(south, west, north, east, precision)
+        if len(cells) <= max_cells:
+            return cells
+    return []
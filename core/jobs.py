@@ -0,0 +1,194 @@
+"""
+Background jobs for the heavy case actions, queued in the database.
+
+``POST /api/jobs/`` queues a ``Job`` running one of ``JOB_KINDS`` (a case
+viewset action) and answers with its id right away. ``manage.py
+run_workers`` claims queued jobs and runs them on a pool of processes:
+the action is called on the program's viewset as the job's user, with the
+job's query parameters, so it sees the same cases and validates its
+parameters like the synchronous endpoint. The output is stored in
+``Job.result``, downloadable from ``/api/jobs/<id>/download/``.
+
+A job is claimed by a conditional UPDATE of its status, so several
+``run_workers`` processes can share the table without a broker. A job is
+only claimed while its user has fewer than ``JOBS_MAX_PER_USER`` jobs
+running and its kind fewer than ``JOBS_MAX_PER_KIND[kind]`` (kinds missing
+from the setting are only limited by the number of processes); the counts
+are read from the table, so the limits hold across processes (two
+dispatchers claiming at the same instant may overshoot them by one).
+Jobs running longer than ``JOBS_TIMEOUT`` seconds, e.g. because their
+worker died, are marked failed. A user with ``JOBS_MAX_QUEUED_PER_USER``
+jobs waiting gets ``429 Too Many Requests`` until some of them start.
+"""
+import logging
+import os
+import socket
+import tempfile
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, transaction
+from django.http import HttpRequest, QueryDict, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import APIException, Throttled
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from . import routers
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Case viewset actions that can run as jobs.
+JOB_KINDS = ('export', 'epicurve')
+
+
+def max_per_user():
+    return getattr(settings, 'JOBS_MAX_PER_USER', 2)
+
+
+def max_per_kind(kind):
+    """Running jobs of ``kind`` allowed at once, or ``None`` for no limit."""
+    return getattr(settings, 'JOBS_MAX_PER_KIND', {}).get(kind)
+
+
+def max_queued_per_user():
+    return getattr(settings, 'JOBS_MAX_QUEUED_PER_USER', 10)
+
+
+def timeout():
+    return timedelta(seconds=getattr(settings, 'JOBS_TIMEOUT', 3600))
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def program_viewsets():
+    # Imported here: core.dashboard walks the URLconf, which imports the views.
+    from .dashboard import program_viewsets
+    return program_viewsets()
+
+
+def submit(user, kind, program, params):
+    """
+    Queue ``kind`` over ``program`` for ``user``; ``params`` maps names to lists of values.
+
+    Raises ``Throttled`` when the user already has ``JOBS_MAX_QUEUED_PER_USER``
+    jobs queued.
+    """
+    with transaction.atomic():
+        # Serializes the submissions of one user, so the limit holds.
+        get_user_model().objects.select_for_update().filter(pk=user.pk).exists()
+        if Job.objects.filter(user=user, status=Job.QUEUED).count() >= max_queued_per_user():
+            raise Throttled(detail=f'At most {max_queued_per_user()} jobs can be queued; wait for some to start.')
+        return Job.objects.create(user=user, kind=kind, program=program, params=params)
+
+
+def claim(limit, worker):
+    """Mark up to ``limit`` queued jobs as run by ``worker``, oldest first; returns their ids."""
+    if limit <= 0:
+        return []
+    running = Job.objects.filter(status=Job.RUNNING).values_list('user_id', 'kind')
+    per_user = Counter(user_id for user_id, _ in running)
+    per_kind = Counter(kind for _, kind in running)
+    claimed = []
+    queued = Job.objects.filter(status=Job.QUEUED).order_by('created_at', 'pk').values_list('pk', 'user_id', 'kind')
+    for pk, user_id, kind in queued.iterator():
+        kind_limit = max_per_kind(kind)
+        if per_user[user_id] >= max_per_user() or (kind_limit is not None and per_kind[kind] >= kind_limit):
+            continue
+        # Another dispatcher may have claimed the job since it was read.
+        if Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, worker=worker, started_at=timezone.now(),
+        ):
+            per_user[user_id] += 1
+            per_kind[kind] += 1
+            claimed.append(pk)
+            if len(claimed) == limit:
+                break
+    return claimed
+
+
+def expire(now=None):
+    """Fail the jobs running for longer than ``JOBS_TIMEOUT``; returns how many."""
+    now = now or timezone.now()
+    return Job.objects.filter(status=Job.RUNNING, started_at__lt=now - timeout()).update(
+        status=Job.FAILED, finished_at=now, error={'detail': 'Timed out.'},
+    )
+
+
+def fail(job_id, error):
+    """Mark the running job ``job_id`` failed; ``error`` is an API error detail."""
+    Job.objects.filter(pk=job_id, status=Job.RUNNING).update(
+        status=Job.FAILED, finished_at=timezone.now(), error=error,
+    )
+
+
+def _request(job):
+    http = HttpRequest()
+    http.method = 'GET'
+    query = QueryDict(mutable=True)
+    for name, values in job.params.items():
+        query.setlist(name, values)
+    http.GET = query
+    request = Request(http)
+    request.user = job.user
+    return request
+
+
+def _write(job, response, out):
+    if isinstance(response, StreamingHttpResponse):
+        for chunk in response.streaming_content:
+            out.write(chunk)
+        _, _, filename = response.get('Content-Disposition', '').partition('filename=')
+        return filename.strip('"') or f'{job.program}-{job.kind}.txt', response['Content-Type']
+    out.write(JSONRenderer().render(response.data))
+    return f'{job.program}-{job.kind}-{job.pk}.json', 'application/json'
+
+
+def run(job):
+    """Run ``job``'s action and store its output; raises ``APIException`` on invalid parameters."""
+    viewset = program_viewsets()[job.program]
+    view = viewset(action=job.kind, format_kwarg=None, args=(), kwargs={})
+    view.request = _request(job)
+    with tempfile.TemporaryFile() as out:
+        with routers.analytics_reads(job.program):
+            response = getattr(view, job.kind)(view.request)
+            job.filename, job.content_type = _write(job, response, out)
+        out.seek(0)
+        job.result.save(job.filename, File(out), save=False)
+
+
+def _finish(job):
+    finished = Job.objects.filter(pk=job.pk, status=Job.RUNNING).update(
+        status=Job.SUCCEEDED, finished_at=timezone.now(), result=job.result.name,
+        filename=job.filename, content_type=job.content_type,
+    )
+    if not finished:
+        # Timed out meanwhile: nobody will download the result.
+        job.result.delete(save=False)
+
+
+def execute(job_id):
+    """Run the claimed job ``job_id``; the entry point of the worker processes."""
+    close_old_connections()
+    try:
+        job = Job.objects.select_related('user').filter(pk=job_id).first()
+        if job is None:
+            return
+        try:
+            run(job)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+            fail(job_id, detail)
+        except Exception:
+            logger.exception('Job %s failed', job_id)
+            fail(job_id, {'detail': 'Internal error.'})
+        else:
+            _finish(job)
+    finally:
+        close_old_connections()
@@ -0,0 +1,168 @@
+import json
+import platform
+import subprocess
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from core import benchmark, synthetic
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def _busiest_owners():
+    """``{program: user}`` owning the most cases of each program."""
+    User = get_user_model()
+    users = {}
+    for program, model in synthetic.program_models().items():
+        top = (
+            model.objects.exclude(created_by=None)
+            .values_list('created_by').annotate(cases=Count('pk')).order_by('-cases').first()
+        )
+        if top is not None:
+            users[program] = User.objects.get(pk=top[0])
+    return users
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the case APIs through the test client at one or more data sizes '
+        'and write the results as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000',
+            help='Comma-separated cases per program, e.g. 1000,10000,100000.',
+        )
+        parser.add_argument('--users', type=int, default=10, help='Synthetic users per role.')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per scenario.')
+        parser.add_argument('--seed', default='0')
+        parser.add_argument('--only', help='Run the scenarios whose name contains this text.')
+        parser.add_argument(
+            '--in-place', action='store_true',
+            help='Benchmark the data already in the database instead of a generated test database.',
+        )
+        parser.add_argument('--cache', action='store_true', help='Keep the analytics response cache on.')
+        parser.add_argument('--rollups', action='store_true', help='Serve analytics from the rollup tables.')
+        parser.add_argument(
+            '--encodings', action='store_true',
+            help='Also measure response size and encode time per response format and compression.',
+        )
+        parser.add_argument('--output', help='Results file (default: benchmark-<commit>.json).')
+        parser.add_argument('--compare', metavar='BASELINE', help='Results file to compare against.')
+        parser.add_argument('--threshold', type=float, default=1.25, help='Median slowdown ratio that fails --compare.')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted({int(size) for size in options['sizes'].split(',') if size.strip()})
+        except ValueError:
+            raise CommandError('--sizes must be comma-separated integers.')
+        if not sizes or sizes[0] < 1 or options['repeat'] < 1:
+            raise CommandError('--sizes and --repeat must be positive.')
+
+        commit = _git_commit()
+        report = {
+            'commit': commit,
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'options': {name: options[name] for name in ('users', 'repeat', 'seed', 'cache', 'rollups', 'in_place')},
+            'sizes': {},
+        }
+        self.encodings = {}
+        overrides = {'ANALYTICS_USE_ROLLUPS': options['rollups']}
+        if not options['cache']:
+            overrides['ANALYTICS_CACHE'] = None
+        elif not settings.ANALYTICS_CACHE:
+            # No shared cache configured: one process needs none.
+            overrides['ANALYTICS_CACHE'] = {'BACKEND': 'core.cache.LocMemLRUBackend'}
+
+        try:
+            setup_test_environment()
+            teardown = True
+        except RuntimeError:
+            # Already set up, e.g. when called from a test.
+            teardown = False
+        try:
+            with override_settings(**overrides):
+                if options['in_place']:
+                    # Roll back the cases created by the write scenarios.
+                    with transaction.atomic():
+                        report['sizes']['existing'] = self._run(options, 'existing')
+                        transaction.set_rollback(True)
+                else:
+                    report['sizes'] = self._run_sizes(sizes, options)
+        finally:
+            if teardown:
+                teardown_test_environment()
+
+        if self.encodings:
+            report['encodings'] = self.encodings
+        output = options['output'] or f'benchmark-{commit or "local"}.json'
+        with open(output, 'w') as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+        if options['compare']:
+            with open(options['compare']) as handle:
+                baseline = json.load(handle)
+            if not set(baseline.get('sizes', {})) & set(report['sizes']):
+                raise CommandError(f'{options["compare"]} has no data size in common with this run.')
+            regressions = benchmark.compare(baseline, report, threshold=options['threshold'])
+            for size, name, message in regressions:
+                self.stdout.write(self.style.ERROR(f'[{size}] {name}: {message}'))
+            if regressions:
+                raise CommandError(f'{len(regressions)} regression(s) against {options["compare"]}')
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {options["compare"]}'))
+
+    def _run_sizes(self, sizes, options):
+        results = {}
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            generated = 0
+            for size in sizes:
+                call_command(
+                    'generate_cases', cases=size - generated, users=options['users'],
+                    seed=f'{options["seed"]}-{size}', stdout=self.stdout,
+                )
+                generated = size
+                results[str(size)] = self._run(options, str(size))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        return results
+
+    def _run(self, options, label):
+        scenarios = benchmark.scenarios(_busiest_owners())
+        if options['only']:
+            scenarios = [scenario for scenario in scenarios if options['only'] in scenario.name]
+        results = benchmark.run(scenarios, repeat=options['repeat'])
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<45} {result['status']:>3} {result['queries']:>4}q "
+                f"{result['median_ms']:>10.2f}ms {result['bytes']:>10}B"
+            )
+        if options['encodings']:
+            self.encodings[label] = benchmark.encodings(scenarios, repeat=options['repeat'])
+            for name, result in self.encodings[label].items():
+                self.stdout.write(
+                    f"{name:<45} {result['status']:>3} {result['bytes']:>10}B {result['encode_ms']:>9.2f}ms encode"
+                )
+        return results
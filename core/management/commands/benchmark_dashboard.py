@@ -0,0 +1,100 @@
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from core.dashboard import case_viewsets
+from users.serializers import LoginSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the latency of a full dashboard fetched through the sync actions '
+        'with the async /api/analytics/dashboard/ view, against a running server, e.g. '
+        '`uvicorn config.asgi:application --workers 1` next to `gunicorn config.wsgi`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server running the ASGI app.')
+        parser.add_argument('--sync-url', help='Server for the sync requests (default: --url).')
+        parser.add_argument('--user', required=True, help='Username to request the dashboard as.')
+        parser.add_argument('--repeat', type=int, default=20, help='Dashboards fetched per client and mode.')
+        parser.add_argument('--clients', type=int, default=1, help='Dashboards fetched at the same time.')
+        parser.add_argument('--recent', type=int, default=10)
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user {options['user']!r}.")
+        self.token = str(LoginSerializer.get_token(user).access_token)
+        async_url = options['url'].rstrip('/')
+        sync_url = (options['sync_url'] or async_url).rstrip('/')
+
+        sync_paths = []
+        for basename in sorted(case_viewsets()):
+            sync_paths += [
+                reverse(f'{basename}-statistics'),
+                reverse(f'{basename}-distributions'),
+                reverse(f'{basename}-epicurve'),
+                reverse(f'{basename}-list') + '?' + urlencode({'page_size': options['recent']}),
+            ]
+        sync_paths = [sync_url + path for path in sync_paths]
+        dashboard = f"{async_url}{reverse('analytics_dashboard')}?{urlencode({'recent': options['recent']})}"
+
+        modes = {
+            # One request after another, as the dashboard page does today.
+            'sync_sequential': lambda: [self._get(url) for url in sync_paths],
+            # Every request at once, like a browser with enough connections.
+            'sync_parallel': lambda: list(self.pool.map(self._get, sync_paths)),
+            'async_dashboard': lambda: self._get(dashboard),
+        }
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(sync_paths) * options['clients']) as self.pool:
+            for name, fetch in modes.items():
+                fetch()  # warm up connections and caches
+                results[name] = self._measure(fetch, options['repeat'], options['clients'])
+                results[name]['requests'] = 1 if name == 'async_dashboard' else len(sync_paths)
+                self.stdout.write(
+                    f"{name:<16} median {results[name]['median_ms']:>9.1f}ms  "
+                    f"p95 {results[name]['p95_ms']:>9.1f}ms  {results[name]['requests']:>3} request(s)/dashboard"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump({'options': {k: options[k] for k in ('url', 'repeat', 'clients', 'recent')},
+                           'results': results}, handle, indent=2, sort_keys=True)
+
+    def _get(self, url):
+        request = Request(url, headers={'Authorization': f'Bearer {self.token}', 'Accept-Encoding': 'identity'})
+        try:
+            with urlopen(request) as response:
+                return response.read()
+        except HTTPError as error:
+            raise CommandError(f'{url}: HTTP {error.code}')
+
+    def _measure(self, fetch, repeat, clients):
+        def timed(_):
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                fetch()
+                timings.append((time.perf_counter() - start) * 1000)
+            return timings
+
+        with ThreadPoolExecutor(max_workers=clients) as runners:
+            timings = sorted(t for client in runners.map(timed, range(clients)) for t in client)
+        return {
+            'median_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'runs': len(timings),
+        }
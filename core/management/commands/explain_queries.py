@@ -0,0 +1,85 @@
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from core import rollups
+
+# Plan fragments (SQLite and PostgreSQL) used to summarise the access path.
+COVERING_PATTERN = re.compile(r'USING COVERING INDEX|Index Only Scan')
+INDEX_PATTERN = re.compile(r'USING INDEX|Index Scan|Bitmap Index Scan')
+SORT_PATTERN = re.compile(r'USE TEMP B-TREE|\bSort\b')
+
+
+def access_path(plan):
+    """``covering``, ``index``, ``index+sort`` or ``scan``."""
+    if COVERING_PATTERN.search(plan):
+        access = 'covering'
+    elif INDEX_PATTERN.search(plan):
+        access = 'index'
+    else:
+        return 'scan'
+    return f'{access}+sort' if SORT_PATTERN.search(plan) else access
+
+
+class Command(BaseCommand):
+    help = (
+        'Print the query plans and timings of the case list and analytics '
+        'queries, to check that they use the owner indexes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'programs', nargs='*',
+            help='App labels to explain, e.g. hso_cases (default: all).',
+        )
+        parser.add_argument('--owner', type=int, help='created_by id to filter on (default: busiest owner).')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query.')
+        parser.add_argument('--plans', action='store_true', help='Print the full plans.')
+
+    def handle(self, *args, **options):
+        sources = {rollups.program_of(model): (model, dimensions)
+                   for model, dimensions in rollups.registered().items()}
+        programs = options['programs'] or list(sources)
+        unknown = set(programs) - set(sources)
+        if unknown:
+            raise CommandError(f"Unknown program(s): {', '.join(sorted(unknown))}")
+
+        for program in programs:
+            model, dimensions = sources[program]
+            owner = options['owner'] or self._busiest_owner(model)
+            cases = model.objects.filter(created_by_id=owner)
+            queries = {'list': cases.order_by('-created_at')[:50]}
+            for dimension in dimensions:
+                queries[f'by {dimension}'] = (
+                    cases.values(dimension).annotate(count=Count('pk')).order_by(dimension)
+                )
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{program} (owner {owner})'))
+            for label, queryset in queries.items():
+                plan = queryset.explain()
+                access = access_path(plan)
+                elapsed = self._time(queryset, options['repeat'])
+                style = self.style.WARNING if access == 'scan' or access.endswith('sort') else self.style.SUCCESS
+                self.stdout.write(f'  {label:<32} {style(f"{access:<14}")} {elapsed * 1000:8.2f} ms')
+                if options['plans']:
+                    for line in plan.splitlines():
+                        self.stdout.write(f'      {line}')
+
+    def _busiest_owner(self, model):
+        row = (
+            model.objects.values_list('created_by')
+            .annotate(total=Count('pk'))
+            .order_by('-total')
+            .first()
+        )
+        return row[0] if row else None
+
+    def _time(self, queryset, repeat):
+        best = float('inf')
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            list(queryset.all())
+            best = min(best, time.perf_counter() - start)
+        return best
@@ -0,0 +1,61 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import conditional, search, synthetic, tags
+
+
+class Command(BaseCommand):
+    help = 'Insert synthetic cases for load tests and benchmarks (see core/synthetic.py).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'programs', nargs='*',
+            help='App labels to fill, e.g. chw_cases (default: all).',
+        )
+        parser.add_argument('--cases', type=int, default=10000, help='Cases per program.')
+        parser.add_argument('--users', type=int, default=10, help='Synthetic users per role.')
+        parser.add_argument('--districts', type=int, default=len(synthetic.DISTRICTS))
+        parser.add_argument('--days', type=int, default=365, help='Age of the oldest case.')
+        parser.add_argument('--seed', default='0')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--skip-derived', action='store_true',
+            help='Do not maintain tags, search index, rollups and summaries (rebuild them later).',
+        )
+
+    def handle(self, *args, **options):
+        models = synthetic.program_models()
+        programs = options['programs'] or list(models)
+        unknown = set(programs) - set(models)
+        if unknown:
+            raise CommandError(f"Unknown program(s): {', '.join(sorted(unknown))}")
+        if options['users'] < 1 or options['districts'] < 1 or options['days'] < 1:
+            raise CommandError('--users, --districts and --days must be positive.')
+
+        owners = synthetic.ensure_users(options['users'], programs)
+        for program in programs:
+            started = time.perf_counter()
+            factory = synthetic.CaseFactory(
+                program, owners[program], districts=options['districts'],
+                days=options['days'], seed=options['seed'],
+            )
+            remaining = options['cases']
+            while remaining > 0:
+                size = min(remaining, options['batch_size'])
+                with transaction.atomic(), synthetic.explicit_created_at(factory.model):
+                    created = factory.model.objects.bulk_create(factory.build(size))
+                    if not options['skip_derived']:
+                        tags.sync(created)
+                        search.index_cases(created)
+                remaining -= size
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'{program}: {options["cases"]} cases in {elapsed:.1f}s')
+
+        if not options['skip_derived']:
+            call_command('rebuild_rollups', *programs, stdout=self.stdout)
+            call_command('rebuild_dashboard_summaries', *programs, stdout=self.stdout)
+        for program in programs:
+            conditional.cases_changed(program)
@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core import sync
+
+
+class Command(BaseCommand):
+    help = 'Delete the sync tombstones of cases deleted longer ago than CASE_SYNC_TOMBSTONE_DAYS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Keep more days of tombstones than the setting.')
+
+    def handle(self, *args, **options):
+        # Watermarks older than the setting force a reset, so tombstones
+        # older than that are never read; younger ones must stay.
+        days = max(options['days'] or 0, sync.retention().days)
+        deleted = sync.prune(timezone.now() - timedelta(days=days))
+        self.stdout.write(self.style.SUCCESS(f'{deleted} tombstone(s) deleted'))
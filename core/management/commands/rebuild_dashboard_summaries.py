@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import rollups, summaries
+from core.models import UserDashboardSummary
+
+
+class Command(BaseCommand):
+    help = "Recompute every user's dashboard summaries from the raw case rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'programs', nargs='*',
+            help='App labels to rebuild, e.g. chw_cases (default: all).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        models = {rollups.program_of(model): model for model in summaries.registered()}
+        programs = options['programs'] or list(models)
+        unknown = set(programs) - set(models)
+        if unknown:
+            raise CommandError(f"Unknown program(s): {', '.join(sorted(unknown))}")
+
+        for program in programs:
+            model = models[program]
+            owners = model.objects.exclude(created_by=None).order_by().values_list('created_by', flat=True).distinct()
+            with transaction.atomic():
+                UserDashboardSummary.objects.filter(program=program).delete()
+                created = UserDashboardSummary.objects.bulk_create(
+                    (UserDashboardSummary(user_id=owner_id, program=program, data=summaries.build(model, owner_id))
+                     for owner_id in owners),
+                    batch_size=options['batch_size'],
+                )
+            self.stdout.write(self.style.SUCCESS(f'{program}: {len(created)} summaries'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import conditional, rollups
+from core.models import CaseRollup
+
+
+class Command(BaseCommand):
+    help = 'Recompute the case rollup tables from the raw case rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'programs', nargs='*',
+            help='App labels to rebuild, e.g. chw_cases (default: all).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        sources = {rollups.program_of(model): (model, dimensions)
+                   for model, dimensions in rollups.registered().items()}
+        programs = options['programs'] or list(sources)
+        unknown = set(programs) - set(sources)
+        if unknown:
+            raise CommandError(f"Unknown program(s): {', '.join(sorted(unknown))}")
+
+        for program in programs:
+            model, dimensions = sources[program]
+            with transaction.atomic():
+                CaseRollup.objects.filter(program=program).delete()
+                created = CaseRollup.objects.bulk_create(
+                    rollups.build(model, dimensions), batch_size=options['batch_size'],
+                )
+                conditional.cases_changed(program)
+            self.stdout.write(self.style.SUCCESS(f'{program}: {len(created)} rollup rows'))
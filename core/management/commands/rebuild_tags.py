@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core import conditional, rollups, tags
+
+
+class Command(BaseCommand):
+    help = 'Recompute the normalized case tags from the free-text list fields.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'programs', nargs='*',
+            help='App labels to rebuild, e.g. chw_cases (default: all).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        sources = {rollups.program_of(model): (model, fields)
+                   for model, fields in tags.registered().items()}
+        programs = options['programs'] or list(sources)
+        unknown = set(programs) - set(sources)
+        if unknown:
+            raise CommandError(f"Unknown program(s): {', '.join(sorted(unknown))}")
+
+        batch_size = options['batch_size']
+        for program in programs:
+            model, fields = sources[program]
+            cases = model.objects.only('pk', *fields).order_by('pk')
+            total = 0
+            with transaction.atomic():
+                batch = []
+                for case in cases.iterator(chunk_size=batch_size):
+                    batch.append(case)
+                    if len(batch) == batch_size:
+                        tags.sync(batch)
+                        total += len(batch)
+                        batch = []
+                tags.sync(batch)
+                total += len(batch)
+                conditional.cases_changed(program)
+            self.stdout.write(self.style.SUCCESS(f'{program}: {total} cases tagged'))
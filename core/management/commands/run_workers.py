@@ -0,0 +1,72 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = 'Run the queued background jobs (see core/jobs.py) on a pool of worker processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=getattr(settings, 'JOBS_PROCESSES', 2),
+            help='Worker processes; 0 runs the jobs in this process, one at a time.',
+        )
+        parser.add_argument(
+            '--poll', type=float, default=getattr(settings, 'JOBS_POLL_INTERVAL', 1.0),
+            help='Seconds between looks at the queue while it is empty or the limits are reached.',
+        )
+        parser.add_argument('--once', action='store_true', help='Exit once no job is queued or running.')
+
+    def handle(self, *args, **options):
+        processes = max(options['processes'], 0)
+        worker = jobs.worker_name()
+        pool = None
+        if processes:
+            # Spawned rather than forked: no database connection or lock of
+            # this process leaks into the workers, which set Django up afresh.
+            pool = ProcessPoolExecutor(
+                processes, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup,
+            )
+        running = {}
+        done = 0
+        self.stdout.write(f'{worker}: running jobs on {processes or "no"} worker process(es)')
+        try:
+            while True:
+                close_old_connections()
+                expired = jobs.expire()
+                if expired:
+                    self.stderr.write(f'{expired} job(s) timed out')
+                claimed = jobs.claim((processes or 1) - len(running), worker)
+                for job_id in claimed:
+                    if pool is None:
+                        jobs.execute(job_id)
+                        done += 1
+                    else:
+                        running[pool.submit(jobs.execute, job_id)] = job_id
+                if not running and not claimed:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll'])
+                    continue
+                if running:
+                    finished, _ = wait(running, timeout=options['poll'], return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        job_id = running.pop(future)
+                        done += 1
+                        if future.exception() is not None:
+                            # The worker process died; execute() handles the job's own errors.
+                            jobs.fail(job_id, {'detail': 'Worker crashed.'})
+        except KeyboardInterrupt:
+            self.stdout.write('Interrupted, waiting for the running jobs')
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+            close_old_connections()
+        self.stdout.write(self.style.SUCCESS(f'{done} job(s) run'))
@@ -0,0 +1,192 @@
+"""
+In-process request metrics, filled by ``core.middleware.RequestMetricsMiddleware``.
+
+Every request is reported under its endpoint (URL name, or ``unmatched``),
+viewset action and method with five measurements: wall time, SQL query
+count, SQL time, serialization time and response size. Each series keeps
+cumulative sums plus a rolling window of the last ``METRICS_WINDOW``
+samples for the p50/p95/p99 quantiles. Counters are per process, like the
+analytics cache statistics.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# name: (Prometheus metric, help text)
+MEASUREMENTS = {
+    'duration': ('datapp_request_duration_seconds', 'Wall time spent handling the request.'),
+    'queries': ('datapp_request_db_queries', 'SQL queries executed per request.'),
+    'db_time': ('datapp_request_db_seconds', 'Time spent executing SQL per request.'),
+    'serialize_time': ('datapp_request_serialize_seconds', 'Time spent serializing and rendering the response.'),
+    'response_bytes': ('datapp_response_size_bytes', 'Size of the response body.'),
+}
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Measurements of the request being handled."""
+    __slots__ = ('queries', 'db_time', 'serialize_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+
+
+@contextmanager
+def bind(request_metrics):
+    """
+    Report the queries and serialization of the block to ``request_metrics``.
+
+    The binding is a context variable, so it follows the request into
+    ``sync_to_async`` threads and the async ORM.
+    """
+    token = _current.set(request_metrics)
+    try:
+        yield request_metrics
+    finally:
+        _current.reset(token)
+
+
+def current():
+    """``RequestMetrics`` of the request being handled, or ``None``."""
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    """``execute_wrapper`` hook installed on every connection by ``install``."""
+    request_metrics = _current.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        request_metrics.db_time += time.perf_counter() - start
+        request_metrics.queries += 1
+
+
+def install(sender, connection, **kwargs):
+    """``connection_created`` receiver adding ``record_query`` to the connection."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def serializing():
+    """Count the time spent in the block as serialization of the current request."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialize_time += time.perf_counter() - start
+
+
+def _quantile(ordered, q):
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Series:
+    """Cumulative count/sum and a rolling window of one measurement."""
+    __slots__ = ('count', 'total', 'window')
+
+    def __init__(self, window):
+        self.count = 0
+        self.total = 0
+        self.window = deque(maxlen=window)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.window.append(value)
+
+    def summary(self):
+        ordered = sorted(self.window)
+        return {
+            'count': self.count,
+            'sum': self.total,
+            **{f'p{round(q * 100)}': _quantile(ordered, q) for q in QUANTILES},
+        }
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+        self._statuses = {}
+
+    def observe(self, endpoint, action, method, status, **values):
+        labels = (endpoint, action, method)
+        window = getattr(settings, 'METRICS_WINDOW', 1024)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = {name: Series(window) for name in MEASUREMENTS}
+            for name, value in values.items():
+                series[name].observe(value)
+            key = labels + (str(status),)
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+
+    def report(self):
+        """Per-endpoint summaries, slowest p95 first."""
+        with self._lock:
+            rows = [
+                {
+                    'endpoint': endpoint, 'action': action, 'method': method,
+                    **{name: measurement.summary() for name, measurement in series.items()},
+                }
+                for (endpoint, action, method), series in self._series.items()
+            ]
+        return sorted(rows, key=lambda row: row['duration']['p95'], reverse=True)
+
+    def prometheus(self):
+        """The registry in the Prometheus text exposition format."""
+        with self._lock:
+            series = {labels: {name: s.summary() for name, s in values.items()}
+                      for labels, values in self._series.items()}
+            statuses = dict(self._statuses)
+        lines = [
+            '# HELP datapp_requests_total Requests handled, by response status.',
+            '# TYPE datapp_requests_total counter',
+        ]
+        for (*labels, status), count in sorted(statuses.items()):
+            lines.append(f'datapp_requests_total{{{_labels(*labels)},status="{status}"}} {count}')
+        for name, (metric, help_text) in MEASUREMENTS.items():
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} summary']
+            for labels, summaries in sorted(series.items()):
+                summary, label_text = summaries[name], _labels(*labels)
+                for q in QUANTILES:
+                    value = summary[f'p{round(q * 100)}']
+                    lines.append(f'{metric}{{{label_text},quantile="{q}"}} {value}')
+                lines.append(f'{metric}_sum{{{label_text}}} {summary["sum"]}')
+                lines.append(f'{metric}_count{{{label_text}}} {summary["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self._statuses.clear()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(endpoint, action, method):
+    return f'endpoint="{_escape(endpoint)}",action="{_escape(action)}",method="{_escape(method)}"'
+
+
+registry = Registry()
@@ -0,0 +1,242 @@
+import importlib.util
+import time
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from . import metrics
+
+
+def _server_timing(request_metrics, duration):
+    return ', '.join([
+        f'app;dur={duration * 1000:.1f}',
+        f'db;dur={request_metrics.db_time * 1000:.1f};desc="{request_metrics.queries} queries"',
+        f'serialize;dur={request_metrics.serialize_time * 1000:.1f}',
+    ])
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures every request and reports it to ``core.metrics.registry``.
+
+    Records wall time, SQL query count and time (through the
+    ``execute_wrapper`` that ``core.metrics.install`` puts on every
+    connection), serialization time (serializer ``to_representation`` plus
+    response rendering) and body size, and sends the timings back in a
+    ``Server-Timing`` header. Streaming responses are reported once their
+    body has been sent, so queries issued while streaming are counted too.
+    Works under WSGI and ASGI. Place it first in ``MIDDLEWARE``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with metrics.bind(metrics.RequestMetrics()) as request_metrics:
+            response = self.get_response(request)
+        return self._finish(request, response, request_metrics, start)
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        with metrics.bind(metrics.RequestMetrics()) as request_metrics:
+            response = await self.get_response(request)
+        return self._finish(request, response, request_metrics, start)
+
+    def process_template_response(self, request, response):
+        # Called right before a DRF Response is rendered; the callback runs after.
+        request_metrics, start = metrics.current(), time.perf_counter()
+        if request_metrics is not None:
+            def rendered(response):
+                request_metrics.serialize_time += time.perf_counter() - start
+            response.add_post_render_callback(rendered)
+        return response
+
+    def _finish(self, request, response, request_metrics, start):
+        response.headers['Server-Timing'] = _server_timing(request_metrics, time.perf_counter() - start)
+        if not response.streaming:
+            self._report(request, response, request_metrics, start, len(response.content))
+        elif response.is_async:
+            response.streaming_content = self._astream(
+                request, response, response.streaming_content, request_metrics, start,
+            )
+        else:
+            response.streaming_content = self._stream(
+                request, response, response.streaming_content, request_metrics, start,
+            )
+        return response
+
+    def _stream(self, request, response, content, request_metrics, start):
+        size, chunks = 0, iter(content)
+        try:
+            while True:
+                # Re-bound per chunk: the body is produced after __call__ returned.
+                with metrics.bind(request_metrics):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                size += len(chunk)
+                yield chunk
+        finally:
+            self._report(request, response, request_metrics, start, size)
+
+    async def _astream(self, request, response, content, request_metrics, start):
+        size = 0
+        try:
+            async for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            self._report(request, response, request_metrics, start, size)
+
+    def _report(self, request, response, request_metrics, start, size):
+        match = request.resolver_match
+        endpoint, action = 'unmatched', ''
+        if match is not None:
+            endpoint = match.view_name or match.route
+            actions = getattr(match.func, 'actions', None) or {}
+            action = actions.get(request.method.lower(), '')
+        metrics.registry.observe(
+            endpoint, action, request.method, response.status_code,
+            duration=time.perf_counter() - start,
+            queries=request_metrics.queries,
+            db_time=request_metrics.db_time,
+            serialize_time=request_metrics.serialize_time,
+            response_bytes=size,
+        )
+
+
+def accepted_encodings(header):
+    """``{coding: q}`` of an ``Accept-Encoding`` header."""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses API responses with brotli or gzip, as the client accepts.
+
+    The encoding is negotiated from ``Accept-Encoding`` (quality values
+    honoured, brotli preferred on a tie, and only offered when the
+    ``brotli`` package is installed). Only the API's own content types are
+    compressed: HTML pages, which carry CSRF tokens, are left alone to stay
+    clear of BREACH. Bodies under ``COMPRESSION_MIN_SIZE`` bytes are sent as
+    they are; streaming bodies are compressed as they are produced. Time
+    spent compressing counts as serialization in ``core.metrics``. Place it
+    right after ``RequestMetricsMiddleware``, which then reports the size
+    sent on the wire.
+    """
+    compressible_types = (
+        'application/json',
+        'application/vnd.datapp.columnar+json',
+        'application/msgpack',
+        'application/x-ndjson',
+        'text/csv',
+        'text/plain',
+    )
+
+    @staticmethod
+    def available_encodings():
+        """Supported encodings, most preferred first."""
+        if importlib.util.find_spec('brotli') is not None:
+            return ('br', 'gzip')
+        return ('gzip',)
+
+    def choose_encoding(self, request):
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        chosen, best = None, 0.0
+        for encoding in self.available_encodings():
+            quality = accepted.get(encoding, accepted.get('*', 0.0))
+            if quality > best:
+                chosen, best = encoding, quality
+        return chosen
+
+    def compressor(self, encoding):
+        """``(compress, finish)`` functions of a new stream in ``encoding``."""
+        if encoding == 'br':
+            import brotli
+
+            stream = brotli.Compressor(quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4))
+            return stream.process, stream.finish
+        stream = zlib.compressobj(getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6), zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return stream.compress, stream.flush
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').partition(';')[0].strip().lower()
+        if content_type not in self.compressible_types:
+            return response
+        min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 512)
+        if not response.streaming and len(response.content) < min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.choose_encoding(request)
+        if encoding is None:
+            return response
+
+        compress, finish = self.compressor(encoding)
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._acompress(response.streaming_content, compress, finish)
+            else:
+                response.streaming_content = self._compress(response.streaming_content, compress, finish)
+            del response.headers['Content-Length']
+        else:
+            with metrics.serializing():
+                compressed = compress(response.content) + finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A compressed body is no longer byte-identical to the strong ETag.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _compress(self, content, compress, finish):
+        for chunk in content:
+            with metrics.serializing():
+                data = compress(chunk)
+            if data:
+                yield data
+        with metrics.serializing():
+            data = finish()
+        yield data
+
+    async def _acompress(self, content, compress, finish):
+        async for chunk in content:
+            with metrics.serializing():
+                data = compress(chunk)
+            if data:
+                yield data
+        with metrics.serializing():
+            data = finish()
+        yield data
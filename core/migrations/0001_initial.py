@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('program', models.CharField(max_length=50)),
+                ('dimension', models.CharField(max_length=50)),
+                ('value', models.TextField(blank=True)),
+                ('day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('owner', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['program', 'owner', 'dimension'], name='case_rollup_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('program', 'owner', 'dimension', 'value', 'day'), name='unique_case_rollup')],
+            },
+        ),
+    ]
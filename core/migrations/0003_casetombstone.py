@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tag'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('program', models.CharField(max_length=50)),
+                ('case_id', models.BigIntegerField()),
+                ('district', models.TextField(blank=True)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['program', 'created_by', 'deleted_at'], name='tombstone_owner_idx'), models.Index(fields=['program', 'district', 'deleted_at'], name='tombstone_district_idx')],
+            },
+        ),
+    ]
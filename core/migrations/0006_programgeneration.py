@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_userdashboardsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgramGeneration',
+            fields=[
+                ('program', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('generation', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,641 @@
+import copy
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, Q
+from django.db.models.functions import Substr
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date
+from django.utils.http import http_date
+from rest_framework import permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+
+from . import cache, conditional, epicurve, export, geo, rollups, routers, scoping, search, summaries, sync, tags
+from .distributions import compute_distributions, format_histograms
+from .models import CaseTombstone
+from .params import query_list
+from .parsers import NDJSONParser
+from .statistics import compute_statistics, rollup_dimensions, statistics_from_histograms
+
+
+class CaseScopeMixin:
+    """
+    Limits every action to the cases the user may see (see ``core.scoping``).
+
+    The scope is resolved once per request and applied by ``get_queryset``,
+    so lists, detail views, the analytics actions, the map, the epidemic
+    curve and the export all share the same owner/district filter. Writes
+    only reach the user's own cases.
+    """
+
+    def get_scope(self):
+        if getattr(self, '_scope', None) is None:
+            self._scope = scoping.for_user(self.request.user, self.get_program())
+        return self._scope
+
+    def get_queryset(self):
+        scope = self.get_scope()
+        if self.request.method in permissions.SAFE_METHODS:
+            return super().get_queryset().filter(scope.reads)
+        return super().get_queryset().filter(scope.writes)
+
+    def get_rollup_scope(self):
+        return self.get_scope().rollup_filters()
+
+    def get_cache_scope(self):
+        return self.get_scope().key
+
+
+class ConditionalGetMixin:
+    """
+    ``ETag`` and ``Last-Modified`` on every GET of a case viewset.
+
+    A request whose ``If-None-Match`` (or, without it, ``If-Modified-Since``)
+    still matches gets ``304 Not Modified`` before any aggregation or the
+    serializers run. With a shared ``ANALYTICS_CACHE`` the cached analytics
+    actions take their ETag from the cache's generation, so their validators
+    cost no query. Other actions, and the analytics ones without a shared
+    cache (whose generation would miss the writes of other processes), use
+    the program's write generation, one primary-key lookup (see
+    ``core.conditional``). ``sync`` has watermarks of its own and is left out.
+    """
+    unconditional_actions = ('sync',)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method == 'GET' and self.action not in self.unconditional_actions:
+            self.get = self._conditional(self.get)
+
+    def get_validators(self, request, kwargs):
+        """``(etag, last_modified)`` of the response."""
+        parts = (
+            self.get_cache_scope(), self.action, sorted(kwargs.items()),
+            cache.query_string(request.query_params), request.accepted_renderer.format,
+        )
+        if self._is_collection_action() and self.action not in self.uncached_actions:
+            backend = cache.get_backend()
+            if backend is not None and backend.shared:
+                return conditional.make_etag(backend.generation(self.get_program()), *parts), None
+        generation, updated_at = conditional.generation(self.get_program())
+        return conditional.make_etag(generation, *parts), updated_at and int(updated_at.timestamp())
+
+    def _conditional(self, handler):
+        def conditional_handler(request, *args, **kwargs):
+            etag, last_modified = self.get_validators(request, kwargs)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = handler(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.headers['ETag'] = etag
+                if last_modified is not None:
+                    response.headers['Last-Modified'] = http_date(last_modified)
+            return response
+        return conditional_handler
+
+
+class CaseWriteMixin:
+    """
+    Saves cases and everything derived from them in one transaction.
+
+    New cases are owned by the requesting user. Derived data (tags,
+    rollups, dashboard summaries, sync tombstones) is updated from
+    ``case_changed`` with a snapshot of the case before the write, so a failed
+    side effect rolls the case write back too, and so does the bump of the
+    program's generation (the state behind the ETags). Cached analytics of
+    the program are invalidated once the write commits.
+    """
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            instance = serializer.save(created_by=self.request.user)
+            self.case_changed(None, instance)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            before = copy.copy(serializer.instance)
+            instance = serializer.save()
+            self.case_changed(before, instance)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            before = copy.copy(instance)
+            instance.delete()
+            self.case_changed(before, None)
+
+    def case_changed(self, before, after):
+        if after is not None:
+            tags.sync([after], [before] if before is not None else ())
+        else:
+            sync.record_deletion(before)
+        rollups.case_changed(before, after)
+        summaries.case_changed(before, after)
+        self._invalidate_cache(type(after if after is not None else before))
+
+    def cases_created(self, instances):
+        """Batch counterpart of ``case_changed(None, instance)``."""
+        if not instances:
+            return
+        tags.sync(instances)
+        rollups.cases_created(instances)
+        summaries.cases_created(instances)
+        # bulk_create sends no post_save, so index the batch explicitly.
+        search.index_cases(instances)
+        self._invalidate_cache(type(instances[0]))
+
+    def _invalidate_cache(self, model):
+        conditional.cases_changed(rollups.program_of(model))
+
+
+class BulkCreateMixin:
+    """
+    ``POST .../bulk/`` creates many cases in one request and transaction.
+
+    The body is a JSON array or an NDJSON stream
+    (``Content-Type: application/x-ndjson``) of case objects. Each item may
+    carry an ``idempotency_key``; items whose key already exists for the
+    user are reported as ``exists`` instead of being inserted again, so a
+    retried sync does not duplicate cases. Invalid items are reported with
+    their errors and do not prevent the valid ones from being created.
+    Rows are inserted with ``bulk_create`` in chunks of
+    ``CASE_BULK_CHUNK_SIZE``.
+    """
+
+    @action(detail=False, methods=['post'], url_path='bulk', parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({'detail': 'Expected a JSON array or an NDJSON stream.'})
+        max_items = getattr(settings, 'CASE_BULK_MAX_ITEMS', 5000)
+        if len(items) > max_items:
+            raise ValidationError({'detail': f'At most {max_items} cases per request.'})
+
+        model = self.queryset.model
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+        key_field = model._meta.get_field('idempotency_key')
+        results = [None] * len(items)
+        first_seen = {}
+        pending = []
+
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = {'index': index, 'status': 'invalid', 'errors': {'non_field_errors': ['Expected an object.']}}
+                continue
+            key = item.get('idempotency_key')
+            if key is not None and (not isinstance(key, str) or not key or len(key) > key_field.max_length):
+                results[index] = {'index': index, 'status': 'invalid', 'errors': {
+                    'idempotency_key': [f'Must be a non-empty string of at most {key_field.max_length} characters.'],
+                }}
+                continue
+            if key is not None and key in first_seen:
+                results[index] = {'index': index, 'status': 'duplicate', 'idempotency_key': key, 'duplicate_of': first_seen[key]}
+                continue
+            serializer = serializer_class(data=item, context=context)
+            if not serializer.is_valid():
+                results[index] = {'index': index, 'status': 'invalid', 'errors': serializer.errors}
+                continue
+            if key is not None:
+                first_seen[key] = index
+            pending.append((index, key, serializer.validated_data))
+
+        existing = dict(
+            model.objects
+            .filter(created_by=request.user, idempotency_key__in=list(first_seen))
+            .values_list('idempotency_key', 'id')
+        )
+        to_create = []
+        for index, key, data in pending:
+            if key in existing:
+                results[index] = {'index': index, 'status': 'exists', 'idempotency_key': key, 'id': existing[key]}
+            else:
+                to_create.append((index, model(**data, created_by=request.user, idempotency_key=key)))
+
+        try:
+            with transaction.atomic():
+                created = model.objects.bulk_create(
+                    [instance for _, instance in to_create],
+                    batch_size=getattr(settings, 'CASE_BULK_CHUNK_SIZE', 500),
+                )
+                self.cases_created(created)
+        except IntegrityError:
+            # A concurrent sync inserted one of the keys after our lookup.
+            return Response(
+                {'detail': 'Conflicting idempotency keys, retry the request.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        for index, instance in to_create:
+            results[index] = {'index': index, 'status': 'created', 'idempotency_key': instance.idempotency_key, 'id': instance.pk}
+
+        summary = {
+            state: sum(1 for result in results if result['status'] == state)
+            for state in ('created', 'exists', 'duplicate', 'invalid')
+        }
+        return Response(
+            {**summary, 'results': results},
+            status=status.HTTP_201_CREATED if summary['created'] else status.HTTP_200_OK,
+        )
+
+
+class SparseFieldsetMixin:
+    """
+    Sparse fieldsets for ``list`` and ``retrieve``.
+
+    ``?fields=a,b`` keeps only those fields and ``?exclude=c,d`` drops
+    fields from the default set. The queryset is narrowed with ``.only()``
+    to the selected columns, so unrequested text columns are never read.
+    Without ``?fields=`` the list uses the compact
+    ``list_serializer_class``; detail views keep the full record.
+    """
+    list_serializer_class = None
+    sparse_fieldset_actions = ('list', 'retrieve', 'sync')
+    # Always loaded: the cursor pagination and sync position pages on these.
+    sparse_fieldset_required = ('id', 'created_at', 'updated_at')
+
+    def _uses_sparse_fieldsets(self):
+        return self.request.method == 'GET' and self.action in self.sparse_fieldset_actions
+
+    def get_serializer_class(self):
+        if (self.action == 'list' and self.list_serializer_class is not None
+                and not query_list(self.request.query_params, 'fields')):
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def get_sparse_fields(self):
+        """Serializer fields to render, in declaration order."""
+        if not hasattr(self, '_sparse_fields'):
+            available = list(self.get_serializer_class()().fields)
+            params = self.request.query_params
+            requested, excluded = query_list(params, 'fields'), query_list(params, 'exclude')
+            unknown = [field for field in requested + excluded if field not in available]
+            if unknown:
+                raise ValidationError({'fields': f"Unknown field(s): {', '.join(unknown)}"})
+            self._sparse_fields = [
+                field for field in available
+                if (not requested or field in requested) and field not in excluded
+            ]
+        return self._sparse_fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self._uses_sparse_fieldsets():
+            context['sparse_fields'] = self.get_sparse_fields()
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self._uses_sparse_fieldsets():
+            return queryset
+        columns = {field.name for field in queryset.model._meta.concrete_fields}
+        selected = [field for field in self.get_sparse_fields() if field in columns]
+        return queryset.only(*dict.fromkeys([*self.sparse_fieldset_required, *selected]))
+
+
+class SyncMixin:
+    """
+    ``GET .../sync/?since=<watermark>`` for offline clients (see ``core.sync``).
+
+    Answers ``{"changed": [...], "deleted": [ids], "watermark": ..., "has_more":
+    ..., "reset": ...}``. Without ``since`` every case of the user's scope is
+    sent. At most ``?page_size=`` rows (default ``CASE_SYNC_PAGE_SIZE``) come
+    per response; while ``has_more`` is true the client calls again with the
+    new watermark. ``?fields=`` trims the records like on the list.
+    """
+
+    @action(detail=False, methods=['get'], url_path='sync')
+    def sync(self, request):
+        default = getattr(settings, 'CASE_SYNC_PAGE_SIZE', 500)
+        upper = getattr(settings, 'CASE_PAGE_SIZE_MAX', 500)
+        try:
+            page_size = int(request.query_params.get('page_size', default))
+        except ValueError:
+            raise ValidationError({'page_size': 'Expected an integer.'})
+        if not 1 <= page_size <= upper:
+            raise ValidationError({'page_size': f'Expected a value between 1 and {upper}.'})
+
+        now = timezone.now()
+        scope = self.get_scope()
+        positions, reset = (None, None), False
+        if request.query_params.get('since'):
+            try:
+                positions = sync.decode(request.query_params['since'], scope.key, now)
+            except sync.InvalidWatermark as e:
+                raise ValidationError({'since': str(e)})
+            if positions is None:
+                positions, reset = (None, None), True
+
+        as_of = now - sync.lag()
+        tombstones = CaseTombstone.objects.filter(program=self.get_program()).filter(scope.reads)
+        changed, deleted, positions, has_more = sync.changes(
+            self.filter_queryset(self.get_queryset()), tombstones, positions, page_size, as_of,
+        )
+        return Response({
+            'changed': self.get_serializer(changed, many=True).data,
+            'deleted': deleted,
+            'watermark': sync.encode(scope.key, as_of, *positions),
+            'has_more': has_more,
+            'reset': reset,
+        })
+
+
+class ExportMixin:
+    """
+    ``GET .../export/`` streams the case table as CSV or NDJSON.
+
+    ``?output=csv`` (default) or ``?output=ndjson`` picks the encoding and
+    ``?fields=`` restricts the columns. The same queryset and filters as
+    the list view are used, without pagination.
+    """
+    export_formats = {
+        'csv': (export.iter_csv, 'text/csv'),
+        'ndjson': (export.iter_ndjson, 'application/x-ndjson'),
+    }
+
+    def get_export_columns(self, request):
+        available = [field.name for field in self.queryset.model._meta.concrete_fields]
+        return query_list(request.query_params, 'fields', available)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output not in self.export_formats:
+            raise ValidationError({'output': f"Expected one of: {', '.join(self.export_formats)}"})
+        encode, content_type = self.export_formats[output]
+        columns = self.get_export_columns(request)
+        queryset = self.filter_queryset(self.get_queryset()).order_by('-created_at', '-id')
+        chunk_size = getattr(settings, 'CASE_EXPORT_CHUNK_SIZE', 2000)
+
+        response = StreamingHttpResponse(encode(queryset, columns, chunk_size), content_type=content_type)
+        filename = f'{rollups.program_of(queryset.model)}-{timezone.localdate():%Y%m%d}.{output}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class MapMixin:
+    """
+    ``GET .../map/?bbox=west,south,east,north&zoom=7`` clusters cases for a map.
+
+    Cases inside the box are grouped by geohash prefix, with a prefix
+    length matching the zoom level. Each cell reports its count and
+    centroid, and up to ``?sample=`` recent points are returned as well.
+    The box is first narrowed to a few geohash prefix ranges, so the
+    query walks the geohash index instead of every case.
+    """
+    map_sample_max = 500
+
+    def _parse_bbox(self, request):
+        try:
+            west, south, east, north = (float(part) for part in request.query_params['bbox'].split(','))
+        except (KeyError, ValueError):
+            raise ValidationError({'bbox': 'Expected west,south,east,north in degrees.'})
+        if not (-180 <= west <= east <= 180 and -90 <= south <= north <= 90):
+            raise ValidationError({'bbox': 'Expected west <= east and south <= north within world bounds.'})
+        return west, south, east, north
+
+    def _parse_int(self, request, name, default, upper):
+        try:
+            value = int(request.query_params.get(name, default))
+        except ValueError:
+            raise ValidationError({name: 'Expected an integer.'})
+        if not 0 <= value <= upper:
+            raise ValidationError({name: f'Expected a value between 0 and {upper}.'})
+        return value
+
+    @action(detail=False, methods=['get'], url_path='map')
+    def map(self, request):
+        west, south, east, north = self._parse_bbox(request)
+        zoom = self._parse_int(request, 'zoom', 6, len(geo.ZOOM_PRECISION) - 1)
+        sample = self._parse_int(request, 'sample', 50, self.map_sample_max)
+        precision = geo.precision_for_zoom(zoom)
+
+        cases = self.analytics_cases().filter(
+            latitude__range=(south, north), longitude__range=(west, east),
+        )
+        ranges = Q()
+        for prefix in geo.covering_prefixes(south, west, north, east):
+            # '{' sorts right after 'z', the last geohash character, in the
+            # byte order of the column (see GeohashField).
+            ranges |= Q(geohash__gte=prefix, geohash__lt=prefix + '{')
+        cases = cases.filter(ranges)
+
+        cells = (
+            cases.annotate(cell=Substr('geohash', 1, precision))
+            .values('cell')
+            .annotate(count=Count('pk'), lat=Avg('latitude'), lng=Avg('longitude'))
+            .order_by('cell')
+        )
+        cells = [
+            {'geohash': cell['cell'], 'count': cell['count'], 'latitude': cell['lat'], 'longitude': cell['lng']}
+            for cell in cells
+        ]
+        points = list(
+            cases.order_by('-created_at').values('id', 'latitude', 'longitude', 'disease')[:sample]
+        ) if sample else []
+        return Response({
+            'zoom': zoom,
+            'precision': precision,
+            'total': sum(cell['count'] for cell in cells),
+            'cells': cells,
+            'points': points,
+        })
+
+
+class EpicurveMixin:
+    """
+    ``GET .../epicurve/`` returns case counts per day, ISO week or month.
+
+    Query parameters: ``interval`` (day, week or month; default week),
+    ``date_field`` (one of ``epicurve_date_fields``), ``disease``,
+    ``district``, ``start``/``end`` (ISO dates) and ``rolling`` (size of a
+    trailing moving-average window, in periods). Empty periods between
+    the first and last case (or ``start`` and ``end``) are returned with a
+    zero count; curves longer than ``epicurve_periods_max`` periods are
+    rejected.
+    """
+    epicurve_date_fields = ('created_at',)
+    epicurve_rolling_max = 52
+    # About ten years of days.
+    epicurve_periods_max = 3660
+
+    def _parse_date(self, request, name):
+        value = request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: 'Expected an ISO date (YYYY-MM-DD).'})
+        return parsed
+
+    def _check_periods(self, start, end, interval):
+        if epicurve.period_count(start, end, interval) > self.epicurve_periods_max:
+            raise ValidationError({
+                'interval': f'Expected at most {self.epicurve_periods_max} periods: '
+                            f'narrow start and end or use a longer interval.',
+            })
+
+    @action(detail=False, methods=['get'], url_path='epicurve')
+    def epicurve(self, request):
+        params = request.query_params
+        interval = params.get('interval', 'week')
+        if interval not in epicurve.INTERVALS:
+            raise ValidationError({'interval': f"Expected one of: {', '.join(epicurve.INTERVALS)}"})
+        date_field = params.get('date_field', self.epicurve_date_fields[0])
+        if date_field not in self.epicurve_date_fields:
+            raise ValidationError({'date_field': f"Expected one of: {', '.join(self.epicurve_date_fields)}"})
+        start, end = self._parse_date(request, 'start'), self._parse_date(request, 'end')
+        rolling = params.get('rolling')
+        if rolling is not None:
+            try:
+                rolling = int(rolling)
+            except ValueError:
+                rolling = None
+            if rolling is None or not 1 <= rolling <= self.epicurve_rolling_max:
+                raise ValidationError({'rolling': f'Expected an integer between 1 and {self.epicurve_rolling_max}.'})
+        if start and end:
+            self._check_periods(start, end, interval)
+
+        cases = self.analytics_cases()
+        for name in ('disease', 'district'):
+            if params.get(name):
+                cases = cases.filter(**{name: params[name]})
+        try:
+            cases = cases.filter(**epicurve.date_range_filter(cases.model, date_field, start, end))
+            counts = epicurve.bucket_counts(cases, date_field, interval)
+            if counts and not (start and end):
+                self._check_periods(start or min(counts), end or max(counts), interval)
+            series = epicurve.fill_gaps(counts, interval, start, end)
+        except OverflowError:
+            # The periods around date.max (9999-12-31) cannot be represented.
+            raise ValidationError({'end': 'Expected an earlier date.'})
+        buckets = [{'period': period, 'count': count} for period, count in series]
+        if rolling:
+            averages = epicurve.rolling_average([count for _, count in series], rolling)
+            for bucket, average in zip(buckets, averages):
+                bucket['rolling_average'] = average
+        return Response({'interval': interval, 'date_field': date_field, 'buckets': buckets})
+
+
+class AnalyticsMixin:
+    """
+    Shared ``statistics`` and ``distributions`` plumbing for the case viewsets.
+
+    ``GET .../distributions/?fields=district,sex`` answers with
+    ``{"district": [...], "sex": [...]}`` from one query. Without ``fields``
+    every entry of ``distribution_fields`` is returned.
+
+    When ``settings.ANALYTICS_USE_ROLLUPS`` is on and ``get_rollup_scope``
+    says the current filters can be expressed on ``CaseRollup``, both are
+    answered from the rollup table instead of the raw cases.
+
+    ``?q=`` narrows every analytics action to the cases matching the
+    full-text search (see ``core.search``).
+
+    Every ``detail=False`` GET action is served through ``core.cache`` when
+    ``settings.ANALYTICS_CACHE`` configures a backend, and reads from the
+    analytics replica when one is configured (see ``core.routers``).
+    """
+    distribution_fields = ()
+    statistics_spec = {}
+    # detail=False GET actions whose responses are never cached.
+    uncached_actions = ('export', 'sync')
+    # detail=False GET actions always read from the primary database.
+    primary_actions = ('sync',)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method != 'GET' or not self._is_collection_action():
+            return
+        backend = cache.get_backend()
+        if backend is not None and self.action not in self.uncached_actions:
+            self.get = self._cached(backend, self.get)
+        if self.action not in self.primary_actions:
+            self.get = self._on_replica(self.get)
+
+    def _is_collection_action(self):
+        handler = getattr(self, self.action or '', None)
+        return getattr(handler, 'detail', None) is False
+
+    def _on_replica(self, handler):
+        def replica_handler(request, *args, **kwargs):
+            with routers.analytics_reads(self.get_program()):
+                return handler(request, *args, **kwargs)
+        return replica_handler
+
+    def _cached(self, backend, handler):
+        def cached_handler(request, *args, **kwargs):
+            key = cache.make_key(
+                backend, self.get_program(), self.get_cache_scope(), self.action, request.query_params,
+            )
+            data = cache.lookup(backend, key)
+            if data is not None:
+                return Response(data)
+            response = handler(request, *args, **kwargs)
+            if isinstance(response, Response) and response.status_code == 200:
+                backend.set(key, response.data)
+            return response
+        return cached_handler
+
+    def get_program(self):
+        return rollups.program_of(self.queryset.model)
+
+    def get_analytics_queryset(self):
+        return self.get_queryset()
+
+    def analytics_cases(self):
+        """The analytics queryset, narrowed by the ``?q=`` search when given."""
+        return search.search(self.get_analytics_queryset(), self.request.query_params.get('q'), rank=False)
+
+    def get_rollup_scope(self):
+        """``CaseRollup`` filters equivalent to the analytics queryset, or ``None``."""
+        return None
+
+    def get_cache_scope(self):
+        """Part of the cache key telling apart users who see different cases."""
+        return self.request.user.pk
+
+    def _rollup_scope(self):
+        if not getattr(settings, 'ANALYTICS_USE_ROLLUPS', False):
+            return None
+        if search.terms(self.request.query_params.get('q')):
+            return None
+        return self.get_rollup_scope()
+
+    def get_distribution_fields(self, request):
+        return query_list(request.query_params, 'fields', self.distribution_fields)
+
+    def get_distributions(self, fields):
+        scope = self._rollup_scope()
+        if scope is None:
+            return compute_distributions(self.analytics_cases(), fields)
+        fields = list(dict.fromkeys(fields))
+        model = self.queryset.model
+        return format_histograms(rollups.histograms(model, fields, scope), fields)
+
+    def get_statistics(self):
+        scope = self._rollup_scope()
+        dimensions = rollup_dimensions(self.statistics_spec)
+        if scope is None or dimensions is None:
+            return compute_statistics(self.analytics_cases(), self.statistics_spec)
+        # Every case is counted once per tracked dimension, so any one of
+        # them gives the total.
+        model = self.queryset.model
+        base = rollups.registered()[model][0]
+        tallies = rollups.histograms(model, dimensions | {base}, scope)
+        total = sum(tallies[base].values())
+        return statistics_from_histograms(self.statistics_spec, tallies, total)
+
+    def distribution_response(self, field):
+        """Single histogram, as returned by the per-field actions."""
+        return Response(self.get_distributions([field])[field])
+
+    @action(detail=False, methods=['get'], url_path='distributions')
+    def distributions(self, request):
+        fields = self.get_distribution_fields(request)
+        return Response(self.get_distributions(fields))
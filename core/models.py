@@ -0,0 +1,170 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class CaseRollup(models.Model):
+    """
+    Pre-aggregated case counts per (program, owner, dimension, value, day).
+
+    Maintained by ``core.rollups`` on every case write made through the case
+    viewsets and rebuilt from scratch by ``manage.py rebuild_rollups``.
+    """
+    program = models.CharField(max_length=50)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+'
+    )
+    dimension = models.CharField(max_length=50)
+    value = models.TextField(blank=True)
+    day = models.DateField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['program', 'owner', 'dimension', 'value', 'day'],
+                name='unique_case_rollup',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['program', 'owner', 'dimension'], name='case_rollup_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.program}.{self.dimension}={self.value!r} @ {self.day}: {self.count}"
+
+
+class Tag(models.Model):
+    """
+    A normalized value of a multi-value case field, e.g. one symptom.
+
+    ``kind`` is the source field name (``symptoms``, ``lab_tests_ordered``,
+    ``procedures_done``), shared by every program so they use one vocabulary.
+    """
+    kind = models.CharField(max_length=50)
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'name'], name='unique_tag'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.name}"
+
+
+class CaseTombstone(models.Model):
+    """
+    A deleted case, kept so that ``sync`` can tell clients to drop it.
+
+    ``created_by`` and ``district`` are copied from the case, so tombstones
+    are scoped like the cases themselves (see ``core.scoping``).
+    """
+    program = models.CharField(max_length=50)
+    case_id = models.BigIntegerField()
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    district = models.TextField(blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['program', 'created_by', 'deleted_at'], name='tombstone_owner_idx'),
+            models.Index(fields=['program', 'district', 'deleted_at'], name='tombstone_district_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.program} #{self.case_id} deleted @ {self.deleted_at}"
+
+
+class ProgramGeneration(models.Model):
+    """
+    Write counter of a program's cases, behind the ETags of the case APIs.
+
+    ``core.conditional.bump`` moves it in the transaction of every case
+    write made through the case viewsets (and by the commands rewriting
+    cases or their derived tables).
+    """
+    program = models.CharField(max_length=50, primary_key=True)
+    generation = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.program} generation {self.generation}"
+
+
+class Job(models.Model):
+    """
+    A report or export computed in the background by ``manage.py run_workers``.
+
+    ``kind`` is the case viewset action run (see ``core.jobs``), on the
+    cases of ``program`` visible to ``user``, with the query parameters
+    in ``params``. The output is stored in ``result``.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUSES = [(status, status) for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    kind = models.CharField(max_length=50)
+    program = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default=QUEUED)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Host and pid of the run_workers process that claimed the job.
+    worker = models.CharField(max_length=100, blank=True)
+    result = models.FileField(upload_to='jobs/%Y/%m/%d/', blank=True)
+    filename = models.CharField(max_length=200, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    # Why the job failed, shaped like an API error response.
+    error = models.JSONField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='job_queue_idx'),
+            models.Index(fields=['user', 'created_at'], name='job_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} of {self.program} #{self.pk}: {self.status}"
+
+
+class UserDashboardSummary(models.Model):
+    """
+    Every counter and histogram of one user's cases in one program.
+
+    ``data`` holds ``{'total': n, 'histograms': {dimension: {value: n}}}``,
+    kept current by ``core.summaries`` in the transaction of each case write;
+    ``version`` counts the writes applied.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    program = models.CharField(max_length=50)
+    version = models.PositiveBigIntegerField(default=1)
+    data = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'program'], name='unique_dashboard_summary'),
+        ]
+
+    def __str__(self):
+        return f"{self.program} summary of user #{self.user_id} v{self.version}"
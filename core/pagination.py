@@ -0,0 +1,33 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class CaseCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the case lists, newest first.
+
+    Pages are positioned on ``created_at`` with ``id`` as tie-breaker, so a
+    page costs the same at any depth. The page size defaults to
+    ``REST_FRAMEWORK['PAGE_SIZE']`` and can be lowered or raised with
+    ``?page_size=`` up to ``CASE_PAGE_SIZE_MAX``.
+
+    Staff users can pass ``?paginate=false`` to get the whole list, for
+    small admin exports. Search results (``?q=``) are paged by
+    ``search_rank`` instead, best match first.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, 'CASE_PAGE_SIZE_MAX', 500)
+
+    def get_ordering(self, request, queryset, view):
+        if 'search_rank' in queryset.query.annotations:
+            return ('-search_rank', '-id')
+        return super().get_ordering(request, queryset, view)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get('paginate') == 'false' and request.user.is_staff:
+            return None
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,20 @@
+"""Query parameters shared by the case and analytics APIs."""
+from rest_framework.exceptions import ValidationError
+
+
+def query_list(params, name, allowed=None):
+    """
+    Items of the comma-separated query parameter ``name``, blanks dropped.
+
+    With ``allowed``, a missing parameter selects all of it and any other
+    item is a 400.
+    """
+    value = params.get(name)
+    if not value:
+        return [] if allowed is None else list(allowed)
+    selected = [item.strip() for item in value.split(',') if item.strip()]
+    if allowed is not None:
+        unknown = [item for item in selected if item not in allowed]
+        if unknown:
+            raise ValidationError({name: f"Unknown value(s): {', '.join(unknown)}"})
+    return selected
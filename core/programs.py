@@ -0,0 +1,118 @@
+"""
+Cross-program analytics over the clinical, CHW and HSO case tables.
+
+The case querysets of every program are projected onto their shared
+columns and combined with UNION ALL in a common table expression. The
+distributions and the epidemic curve are computed by GROUP BY branches
+of one statement, so a national dashboard costs a single round trip
+however many programs and fields it shows.
+"""
+from collections import Counter as Tally, defaultdict
+
+from django.db import connections
+from django.db.models import CharField, DateField, Value
+from django.db.models.functions import Trunc
+from django.utils.dateparse import parse_date
+
+from . import epicurve
+
+# Dimensions present on every program's Case model.
+COMMON_FIELDS = ('disease', 'district', 'sex')
+EPICURVE = 'epicurve'
+
+
+def _projection(program, queryset, interval):
+    return (
+        queryset
+        .annotate(
+            program=Value(program, output_field=CharField()),
+            period=Trunc('created_at', interval, output_field=DateField()),
+        )
+        .order_by()
+        .values('program', 'period', *COMMON_FIELDS)
+    )
+
+
+def combined_analytics(querysets, fields, interval='week'):
+    """
+    Distributions, statistics and epicurve for ``querysets`` in one query.
+
+    ``querysets`` maps program label -> Case queryset (already filtered).
+    """
+    programs = list(querysets)
+    if not programs:
+        return {'programs': [], 'statistics': {}, 'distributions': {}, 'epicurve': {}}
+    connection = connections[next(iter(querysets.values())).db]
+    qn = connection.ops.quote_name
+    columns = ', '.join(qn(column) for column in ('program', 'period', *COMMON_FIELDS))
+
+    parts, params = [], []
+    for index, (program, queryset) in enumerate(querysets.items()):
+        sql, part_params = _projection(program, queryset, interval).query.sql_with_params()
+        parts.append(f'SELECT {columns} FROM ({sql}) AS {qn(f"part{index}")}')
+        params.extend(part_params)
+
+    groupings = list(dict.fromkeys([*fields, 'sex']))
+    branches = [
+        f"SELECT %s, {qn('program')}, {qn(field)}, NULL, COUNT(*) FROM cases GROUP BY {qn('program')}, {qn(field)}"
+        for field in groupings
+    ]
+    branches.append(
+        f"SELECT %s, {qn('program')}, NULL, {qn('period')}, COUNT(*) FROM cases GROUP BY {qn('program')}, {qn('period')}"
+    )
+    sql = 'WITH cases AS ({union}) {branches}'.format(
+        union=' UNION ALL '.join(parts), branches=' UNION ALL '.join(branches),
+    )
+    params.extend([*groupings, EPICURVE])
+
+    tallies = defaultdict(lambda: defaultdict(Tally))
+    curve = defaultdict(Tally)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        for kind, program, value, period, count in cursor.fetchall():
+            if kind == EPICURVE:
+                if period is not None:
+                    period = parse_date(period) if isinstance(period, str) else period
+                    curve[period][program] += count
+            else:
+                tallies[kind][value][program] += count
+
+    return {
+        'programs': programs,
+        'statistics': _statistics(programs, tallies['sex']),
+        'distributions': {
+            field: [
+                {field: value, 'count': sum(by_program.values()), 'by_program': _per_program(programs, by_program)}
+                for value, by_program in sorted(tallies[field].items(), key=lambda item: (item[0] is None, item[0]))
+            ]
+            for field in fields
+        },
+        'epicurve': {
+            'interval': interval,
+            'buckets': [
+                {'period': period, 'count': total, 'by_program': _per_program(programs, curve.get(period, {}))}
+                for period, total in epicurve.fill_gaps(
+                    {period: sum(by_program.values()) for period, by_program in curve.items()}, interval,
+                )
+            ],
+        },
+    }
+
+
+def _per_program(programs, tally):
+    return {program: tally.get(program, 0) for program in programs}
+
+
+def _statistics(programs, by_sex):
+    keys = ('total_cases', 'male_cases', 'female_cases')
+    per_program = {program: dict.fromkeys(keys, 0) for program in programs}
+    for value, by_program in by_sex.items():
+        for program, count in by_program.items():
+            counters = per_program[program]
+            counters['total_cases'] += count
+            if value == 'Male':
+                counters['male_cases'] += count
+            elif value == 'Female':
+                counters['female_cases'] += count
+    totals = {key: sum(counters[key] for counters in per_program.values()) for key in keys}
+    return {**totals, 'by_program': per_program}
@@ -0,0 +1,51 @@
+"""
+Compact response formats, chosen by clients through the ``Accept`` header.
+
+``ColumnarJSONRenderer`` (``application/vnd.datapp.columnar+json`` or
+``?format=columnar``) turns every list of records into one array per field,
+``{"id": [1, 2], "disease": ["Malaria", "Cholera"]}``, so field names are
+sent once per list instead of once per row. Lists nested anywhere in the
+payload (``results`` of a page, the histograms of ``distributions``) are
+converted; everything else is left as is.
+
+``MessagePackRenderer`` (``application/msgpack`` or ``?format=msgpack``)
+encodes the regular payload as MessagePack. It needs the ``msgpack``
+package and is only registered when it is installed.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def to_columns(data):
+    """``data`` with every non-empty list of dicts turned into a dict of columns."""
+    if isinstance(data, dict):
+        return {key: to_columns(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        if data and all(isinstance(item, dict) for item in data):
+            fields = list(dict.fromkeys(key for item in data for key in item))
+            return {field: [item.get(field) for item in data] for field in fields}
+        return [to_columns(item) for item in data]
+    return data
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    media_type = 'application/vnd.datapp.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(to_columns(data), accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import msgpack
+
+        if data is None:
+            return b''
+        # Dates, decimals and UUIDs are encoded like in the JSON responses.
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True)
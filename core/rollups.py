@@ -0,0 +1,146 @@
+"""
+Incremental maintenance and reads of ``CaseRollup``.
+
+Case apps register their model and the dimensions to track from their
+``analytics`` module (autodiscovered by ``CoreConfig.ready``). Writes made
+through ``CaseWriteMixin`` adjust the matching rollup rows in the same
+transaction, so reads cost depends on the number of distinct
+(owner, value, day) combinations instead of the number of cases.
+Dimensions registered in ``core.tags`` get one row per tag, so a case
+counts once under each of its symptoms.
+"""
+from collections import Counter as Tally
+
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import tags
+from .models import CaseRollup
+
+_registry = {}
+
+
+def register(model, dimensions):
+    """Track ``dimensions`` of ``model`` in the rollup table."""
+    _registry[model] = tuple(dimensions)
+
+
+def registered():
+    return dict(_registry)
+
+
+def program_of(model):
+    return model._meta.app_label
+
+
+def clean(value):
+    """Histogram key of ``value``."""
+    return '' if value is None else str(value)
+
+
+def values_of(model, dimension, instance):
+    """Values ``instance`` counts under for ``dimension``: its tags for tagged fields."""
+    if tags.tag_field(model, dimension):
+        return tags.values_of(instance, dimension)
+    return [clean(getattr(instance, dimension))]
+
+
+def _key(instance):
+    return {
+        'program': program_of(type(instance)),
+        'owner_id': instance.created_by_id,
+        'day': timezone.localtime(instance.created_at).date(),
+    }
+
+
+def _bump(key, dimension, value, delta):
+    rows = CaseRollup.objects.filter(**key, dimension=dimension, value=value)
+    if rows.update(count=F('count') + delta) or delta < 0:
+        return
+    _, created = CaseRollup.objects.get_or_create(
+        **key, dimension=dimension, value=value, defaults={'count': delta}
+    )
+    if not created:
+        rows.update(count=F('count') + delta)
+
+
+def _deltas(before, after, tally=None):
+    tally = Tally() if tally is None else tally
+    model = type(after if after is not None else before)
+    dimensions = _registry.get(model, ())
+    for instance, sign in ((before, -1), (after, 1)):
+        if instance is None:
+            continue
+        key = tuple(_key(instance).items())
+        for dimension in dimensions:
+            for value in values_of(model, dimension, instance):
+                tally[(key, dimension, value)] += sign
+    return tally
+
+
+def _apply(tally):
+    for (key, dimension, value), delta in tally.items():
+        if delta:
+            _bump(dict(key), dimension, value, delta)
+
+
+def case_changed(before, after):
+    """
+    Apply the rollup delta of a case write.
+
+    ``before`` is a snapshot of the case prior to the write (``None`` on
+    create) and ``after`` the saved case (``None`` on delete). Unchanged
+    dimensions cancel out and cost no query.
+    """
+    _apply(_deltas(before, after))
+
+
+def cases_created(instances):
+    """Apply the rollup delta of a batch of new cases, one bump per distinct row."""
+    tally = Tally()
+    for instance in instances:
+        _deltas(None, instance, tally)
+    _apply(tally)
+
+
+def histograms(model, dimensions, scope):
+    """
+    Return ``{dimension: Counter(value -> count)}`` read from the rollups.
+
+    ``scope`` holds extra ``CaseRollup`` filters, e.g. ``{'owner': user}``.
+    """
+    tallies = {dimension: Tally() for dimension in dimensions}
+    rows = (
+        CaseRollup.objects
+        .filter(program=program_of(model), dimension__in=list(dimensions), **scope)
+        .values_list('dimension', 'value')
+        .annotate(total=Sum('count'))
+        .order_by()
+    )
+    for dimension, value, total in rows:
+        if total:
+            tallies[dimension][value] += total
+    return tallies
+
+
+def build(model, dimensions):
+    """Yield unsaved ``CaseRollup`` rows computed from the raw cases."""
+    label = program_of(model)
+    for dimension in dimensions:
+        m2m = tags.tag_field(model, dimension)
+        rows = (
+            model.objects
+            .annotate(day=TruncDate('created_at'))
+            .values_list('created_by', 'day', f'{m2m}__name' if m2m else dimension)
+            .annotate(total=Count('pk'))
+            .order_by()
+        )
+        merged = Tally()
+        for owner_id, day, value, total in rows.iterator():
+            merged[(owner_id, day, clean(value))] += total
+        for (owner_id, day, value), total in merged.items():
+            yield CaseRollup(
+                program=label, owner_id=owner_id, dimension=dimension,
+                value=value, day=day, count=total,
+            )
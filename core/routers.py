@@ -0,0 +1,74 @@
+"""
+Routing of analytics reads to a read replica.
+
+Reads run inside ``analytics_reads()`` go to ``settings.ANALYTICS_DATABASE``
+when that alias is configured; everything else, and every write, uses the
+primary. A program written to within the last ``ANALYTICS_REPLICA_LAG``
+seconds, by any process, keeps reading from the primary, so a freshly
+invalidated analytics cache is not refilled from a lagging replica. The
+time of the latest write is kept next to the program's generation: in the
+shared analytics cache when there is one, so checking it costs no query,
+else in ``ProgramGeneration`` on the primary (see ``core.conditional``).
+Both are wall-clock times, so the hosts' clocks must agree to well within
+the lag.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from . import cache, conditional
+
+_analytics = ContextVar('analytics_reads', default=False)
+
+
+def replica_alias():
+    """The analytics replica alias, or ``None`` when none is configured."""
+    alias = getattr(settings, 'ANALYTICS_DATABASE', None)
+    return alias if alias in settings.DATABASES else None
+
+
+def _written_at(program):
+    """``time.time()`` of ``program``'s latest write, or ``None``."""
+    backend = cache.get_backend()
+    if backend is not None and backend.shared:
+        return backend.written_at(program)
+    updated_at = conditional.generation(program)[1]
+    return updated_at and updated_at.timestamp()
+
+
+def _recently_written(program):
+    lag = getattr(settings, 'ANALYTICS_REPLICA_LAG', 5)
+    written = _written_at(program)
+    return written is not None and time.time() - written < lag
+
+
+@contextmanager
+def analytics_reads(*programs):
+    """Route the reads of the block to the replica, unless a program was just written."""
+    replica = replica_alias() is not None and not any(_recently_written(program) for program in programs)
+    token = _analytics.set(replica)
+    try:
+        yield
+    finally:
+        _analytics.reset(token)
+
+
+class AnalyticsReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _analytics.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is migrated through replication.
+        return False if db == replica_alias() else None
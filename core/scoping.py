@@ -0,0 +1,77 @@
+"""
+Which cases a user may read and write.
+
+Every user reads and writes the cases they created. The districts assigned
+to a user (``User.districts``) extend their reads to every case of those
+districts, in the programs their role supervises according to
+``settings.CASE_SCOPE_PROGRAMS``. Staff read every case. Writes are always
+limited to the user's own cases.
+
+The filters are plain ``created_by``/``district`` predicates, covered by
+the ``(created_by, ...)`` and ``(district, created_at)`` indexes of the case
+tables, so every query is narrowed before it aggregates anything.
+"""
+from django.conf import settings
+from django.db.models import Q
+
+DEFAULT_SCOPE_PROGRAMS = {
+    'CHW': ('chw_cases',),
+    'CO': ('clinical_cases', 'chw_cases'),
+    'HSO': ('clinical_cases', 'chw_cases', 'hso_cases'),
+}
+
+
+def supervised_programs(role):
+    """Programs whose cases a user of ``role`` reads in their assigned districts."""
+    return getattr(settings, 'CASE_SCOPE_PROGRAMS', DEFAULT_SCOPE_PROGRAMS).get(role, ())
+
+
+class Scope:
+    """The cases of one program visible to one user."""
+
+    def __init__(self, user, districts=(), everything=False):
+        self.user = user
+        self.districts = tuple(districts)
+        self.everything = everything
+
+    @property
+    def reads(self):
+        if self.everything:
+            return Q()
+        own = Q(created_by=self.user)
+        return own | Q(district__in=self.districts) if self.districts else own
+
+    @property
+    def writes(self):
+        return Q(created_by=self.user)
+
+    @property
+    def owner_only(self):
+        """Whether the user reads exactly the cases they created."""
+        return not self.everything and not self.districts
+
+    @property
+    def key(self):
+        """Distinguishes cached responses of different scopes."""
+        if self.everything:
+            return 'all'
+        return ':'.join([str(self.user.pk), *self.districts])
+
+    def rollup_filters(self):
+        """``CaseRollup`` filters equivalent to ``reads``, or ``None``."""
+        if self.everything:
+            return {}
+        if self.districts:
+            # Rollups are kept per owner, not per district.
+            return None
+        return {'owner': self.user}
+
+
+def for_user(user, program):
+    """The ``Scope`` of ``user`` in ``program`` (an app label)."""
+    if user.is_staff:
+        return Scope(user, everything=True)
+    districts = ()
+    if program in supervised_programs(getattr(user, 'role', None)):
+        districts = sorted(set(getattr(user, 'districts', None) or ()))
+    return Scope(user, districts)
@@ -0,0 +1,171 @@
+"""
+Ranked full-text search over the case free-text fields.
+
+Case apps register the fields to search from their ``analytics`` module.
+
+* PostgreSQL: a GIN expression index on ``to_tsvector('simple', ...)`` of
+  the registered fields answers the match, ranked with ``ts_rank``. A
+  trigram GIN index on ``UPPER(patient_name)`` serves the
+  ``patient_name__icontains`` name filters.
+* SQLite: one FTS5 shadow table per program, whose rowid is the case id,
+  kept in sync by ``post_save``/``post_delete`` signals and ranked with
+  ``bm25``.
+* Other backends fall back to ``icontains`` on every field, unranked.
+
+Queries are split into word terms and every term must match as a prefix.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+
+TERM_PATTERN = re.compile(r'\w+')
+NAME_FIELD = 'patient_name'
+
+_registry = {}
+
+
+def register(model, fields):
+    """Search ``fields`` of ``model``; the first one should be ``patient_name``."""
+    _registry[model] = tuple(fields)
+    uid = model._meta.label_lower
+    post_save.connect(_case_saved, sender=model, dispatch_uid=f'case-search-save-{uid}')
+    post_delete.connect(_case_deleted, sender=model, dispatch_uid=f'case-search-delete-{uid}')
+
+
+def terms(query):
+    return [term.lower() for term in TERM_PATTERN.findall(query or '')]
+
+
+def fts_table(db_table):
+    return f'{db_table}_search'
+
+
+def _concat(fields, quote_name):
+    return " || ' ' || ".join(f"COALESCE({quote_name(field)}, '')" for field in fields)
+
+
+def document_sql(fields, quote_name):
+    """The tsvector expression of the PostgreSQL index; queries must match it exactly."""
+    return f"to_tsvector('simple'::regconfig, {_concat(fields, quote_name)})"
+
+
+# Schema, used by the case apps' migrations.
+
+def install(db_table, index_prefix, fields):
+    """``RunPython`` (forwards, backwards) creating the search structures of a case table."""
+    def forwards(apps, schema_editor):
+        connection = schema_editor.connection
+        qn = connection.ops.quote_name
+        if connection.vendor == 'postgresql':
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {qn(index_prefix + "_search_idx")} '
+                f'ON {qn(db_table)} USING GIN (({document_sql(fields, qn)}))'
+            )
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {qn(index_prefix + "_name_trgm_idx")} '
+                f'ON {qn(db_table)} USING GIN ((UPPER({qn(NAME_FIELD)}::text)) gin_trgm_ops)'
+            )
+        elif connection.vendor == 'sqlite':
+            table = qn(fts_table(db_table))
+            schema_editor.execute(f'CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(name, body)')
+            schema_editor.execute(
+                f'INSERT INTO {table} (rowid, name, body) '
+                f'SELECT id, {_concat(fields[:1], qn)}, {_concat(fields[1:], qn)} FROM {qn(db_table)}'
+            )
+
+    def backwards(apps, schema_editor):
+        connection = schema_editor.connection
+        qn = connection.ops.quote_name
+        if connection.vendor == 'postgresql':
+            schema_editor.execute(f'DROP INDEX IF EXISTS {qn(index_prefix + "_search_idx")}')
+            schema_editor.execute(f'DROP INDEX IF EXISTS {qn(index_prefix + "_name_trgm_idx")}')
+        elif connection.vendor == 'sqlite':
+            schema_editor.execute(f'DROP TABLE IF EXISTS {qn(fts_table(db_table))}')
+
+    return forwards, backwards
+
+
+# SQLite shadow table maintenance.
+
+def index_cases(instances):
+    """(Re)index ``instances`` in their program's FTS5 table; no-op elsewhere."""
+    by_model = {}
+    for instance in instances:
+        by_model.setdefault(type(instance), []).append(instance)
+    for model, cases in by_model.items():
+        fields = _registry.get(model)
+        connection = connections[cases[0]._state.db or 'default']
+        if not fields or connection.vendor != 'sqlite':
+            continue
+        table = connection.ops.quote_name(fts_table(model._meta.db_table))
+        rows = [
+            (case.pk, getattr(case, fields[0]) or '', ' '.join(getattr(case, field) or '' for field in fields[1:]))
+            for case in cases
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {table} WHERE rowid = %s', [(row[0],) for row in rows])
+            cursor.executemany(f'INSERT INTO {table} (rowid, name, body) VALUES (%s, %s, %s)', rows)
+
+
+def _case_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_cases([instance])
+
+
+def _case_deleted(sender, instance, **kwargs):
+    connection = connections[instance._state.db or 'default']
+    if connection.vendor != 'sqlite' or sender not in _registry:
+        return
+    table = connection.ops.quote_name(fts_table(sender._meta.db_table))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [instance.pk])
+
+
+# Queries.
+
+def search(queryset, query, rank=True):
+    """
+    Narrow ``queryset`` to cases matching ``query``.
+
+    With ``rank`` the cases are annotated with ``search_rank`` (higher is
+    better) and ordered by it.
+    """
+    words = terms(query)
+    fields = _registry.get(queryset.model)
+    if not words or not fields:
+        return queryset
+    connection = connections[queryset.db]
+    qn = connection.ops.quote_name
+
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f'{word}:*' for word in words)
+        document = document_sql(fields, qn)
+        match = RawSQL(f"{document} @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField())
+        score = RawSQL(f"ts_rank({document}, to_tsquery('simple', %s))", [tsquery], output_field=FloatField())
+    elif connection.vendor == 'sqlite':
+        expression = ' '.join(f'"{word}"*' for word in words)
+        table = qn(fts_table(queryset.model._meta.db_table))
+        row_id = f'{qn(queryset.model._meta.db_table)}.{qn("id")}'
+        match = RawSQL(
+            f'{row_id} IN (SELECT rowid FROM {table} WHERE {table} MATCH %s)',
+            [expression], output_field=BooleanField(),
+        )
+        score = RawSQL(
+            f'(SELECT -bm25({table}) FROM {table} WHERE {table} MATCH %s AND rowid = {row_id})',
+            [expression], output_field=FloatField(),
+        )
+    else:
+        condition = Q()
+        for word in words:
+            condition &= Q(*[Q(**{f'{field}__icontains': word}) for field in fields], _connector=Q.OR)
+        queryset = queryset.filter(condition)
+        return queryset.annotate(search_rank=Value(0.0)) if rank else queryset
+
+    queryset = queryset.alias(search_match=match).filter(search_match=True)
+    if rank:
+        queryset = queryset.annotate(search_rank=score).order_by('-search_rank', '-id')
+    return queryset
@@ -0,0 +1,76 @@
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+from . import jobs, metrics
+from .models import Job
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Drops every field not listed in ``context['sparse_fields']``.
+
+    The list is computed by ``core.mixins.SparseFieldsetMixin`` from the
+    ``?fields=`` / ``?exclude=`` query parameters.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.context.get('sparse_fields')
+        if selected is not None:
+            for name in set(self.fields) - set(selected):
+                self.fields.pop(name)
+
+
+class SerializationTimingMixin:
+    """
+    Reports time spent in ``to_representation`` to ``core.metrics``.
+    """
+
+    def to_representation(self, instance):
+        with metrics.serializing():
+            return super().to_representation(instance)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    A background job; ``params`` holds the query parameters of the action.
+
+    Values may be given as strings or lists of strings, like repeated query
+    parameters.
+    """
+    download = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'program', 'params', 'status', 'created_at', 'started_at', 'finished_at',
+            'error', 'download',
+        ]
+        read_only_fields = ['status', 'created_at', 'started_at', 'finished_at', 'error']
+
+    def validate_kind(self, value):
+        if value not in jobs.JOB_KINDS:
+            raise serializers.ValidationError(f"Expected one of: {', '.join(jobs.JOB_KINDS)}")
+        return value
+
+    def validate_program(self, value):
+        programs = jobs.program_viewsets()
+        if value not in programs:
+            raise serializers.ValidationError(f"Expected one of: {', '.join(programs)}")
+        return value
+
+    def validate_params(self, value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError('Expected an object of query parameters.')
+        params = {}
+        for name, values in value.items():
+            values = values if isinstance(values, list) else [values]
+            if not all(isinstance(item, (str, int, float)) for item in values):
+                raise serializers.ValidationError({name: 'Expected a string or a list of strings.'})
+            params[name] = [str(item) for item in values]
+        return params
+
+    def get_download(self, job):
+        if job.status != Job.SUCCEEDED:
+            return None
+        return reverse('job-download', args=[job.pk], request=self.context.get('request'))
@@ -0,0 +1,197 @@
+"""
+Single-pass statistics engine shared by the case apps.
+
+Each app declares its ``statistics`` payload as an ordered mapping of
+response key -> metric. ``compute_statistics`` turns every metric into a
+filtered aggregate and evaluates the whole spec with one ``aggregate()``
+call, so a dashboard load scans the case table once instead of once per
+counter.
+
+Metrics that only filter on a single field can also be answered from the
+``CaseRollup`` histograms (see ``rollup_dimensions`` and
+``statistics_from_histograms``). The dashboard summaries (``core.summaries``)
+also keep the ``Distinct`` histograms of distinct counts, so every metric
+can be answered from them (see ``summary_dimensions``).
+"""
+from django.db.models import Count, Q
+
+
+def _clean(value):
+    return '' if value is None else str(value)
+
+
+class Distinct:
+    """Histogram of ``field`` among the cases matching ``filters``, for distinct counts."""
+
+    def __init__(self, field, filters):
+        self.field = field
+        self.filters = filters
+
+    @property
+    def name(self):
+        return ':'.join(['distinct', self.field, *(f'{key}={value}' for key, value in sorted(self.filters.items()))])
+
+    def values_of(self, instance):
+        if any(getattr(instance, key) != value for key, value in self.filters.items()):
+            return []
+        return [_clean(getattr(instance, self.field))]
+
+    def histogram(self, queryset):
+        rows = queryset.filter(**self.filters).order_by().values_list(self.field).annotate(count=Count('pk'))
+        return {_clean(value): count for value, count in rows}
+
+
+class Metric:
+    """Base class for a single entry of a statistics spec."""
+
+    def aggregates(self, alias):
+        """Return the ``{alias: expression}`` aggregates this metric needs."""
+        raise NotImplementedError
+
+    def resolve(self, alias, row):
+        """Build the response value from the aggregated ``row``."""
+        raise NotImplementedError
+
+    def rollup_dimensions(self):
+        """Fields needed to answer from rollups, or ``None`` if it cannot be."""
+        return None
+
+    def summary_dimensions(self):
+        """Fields and ``Distinct`` histograms needed to answer from a summary, or ``None``."""
+        return self.rollup_dimensions()
+
+    def from_histograms(self, tallies, total):
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Number of cases matching ``filters`` (all cases when empty)."""
+
+    def __init__(self, **filters):
+        self.filters = filters
+
+    def _condition(self):
+        return Q(**self.filters) if self.filters else None
+
+    def aggregates(self, alias):
+        return {alias: Count('pk', filter=self._condition())}
+
+    def resolve(self, alias, row):
+        return row[alias]
+
+    def rollup_dimensions(self):
+        return set(self.filters) if len(self.filters) <= 1 else None
+
+    def from_histograms(self, tallies, total):
+        if not self.filters:
+            return total
+        [(field, value)] = self.filters.items()
+        return tallies[field][str(value)]
+
+
+class DistinctCounter(Counter):
+    """Number of distinct ``field`` values among cases matching ``filters``."""
+
+    def __init__(self, field, **filters):
+        super().__init__(**filters)
+        self.field = field
+
+    def aggregates(self, alias):
+        return {alias: Count(self.field, distinct=True, filter=self._condition())}
+
+    def rollup_dimensions(self):
+        return None
+
+    @property
+    def distinct(self):
+        return Distinct(self.field, self.filters)
+
+    def summary_dimensions(self):
+        return {self.distinct}
+
+    def from_histograms(self, tallies, total):
+        return sum(1 for count in tallies[self.distinct.name].values() if count > 0)
+
+
+class Ratio(Metric):
+    """``numerator / denominator`` rounded to ``digits``; 0 when the denominator is 0."""
+
+    def __init__(self, numerator, denominator, digits=2):
+        self.numerator = numerator
+        self.denominator = denominator
+        self.digits = digits
+
+    def aggregates(self, alias):
+        return {
+            **self.numerator.aggregates(f'{alias}_num'),
+            **self.denominator.aggregates(f'{alias}_den'),
+        }
+
+    def resolve(self, alias, row):
+        numerator = self.numerator.resolve(f'{alias}_num', row)
+        denominator = self.denominator.resolve(f'{alias}_den', row)
+        return self._divide(numerator, denominator)
+
+    def _divide(self, numerator, denominator):
+        value = numerator / denominator if denominator > 0 else 0
+        return round(value, self.digits)
+
+    def rollup_dimensions(self):
+        numerator = self.numerator.rollup_dimensions()
+        denominator = self.denominator.rollup_dimensions()
+        if numerator is None or denominator is None:
+            return None
+        return numerator | denominator
+
+    def summary_dimensions(self):
+        numerator = self.numerator.summary_dimensions()
+        denominator = self.denominator.summary_dimensions()
+        if numerator is None or denominator is None:
+            return None
+        return numerator | denominator
+
+    def from_histograms(self, tallies, total):
+        return self._divide(
+            self.numerator.from_histograms(tallies, total),
+            self.denominator.from_histograms(tallies, total),
+        )
+
+
+def compute_statistics(queryset, spec):
+    """
+    Evaluate ``spec`` against ``queryset`` in a single query.
+
+    Keys of the returned dict follow the order of ``spec``.
+    """
+    aggregates = {}
+    for key, metric in spec.items():
+        aggregates.update(metric.aggregates(key))
+    row = queryset.order_by().aggregate(**aggregates)
+    return {key: metric.resolve(key, row) for key, metric in spec.items()}
+
+
+def rollup_dimensions(spec):
+    """Fields a rollup read of ``spec`` needs, or ``None`` if one metric needs raw rows."""
+    dimensions = set()
+    for metric in spec.values():
+        needed = metric.rollup_dimensions()
+        if needed is None:
+            return None
+        dimensions |= needed
+    return dimensions
+
+
+def summary_dimensions(spec):
+    """Fields and ``Distinct`` histograms a summary of ``spec`` needs, or ``None``."""
+    dimensions = set()
+    for metric in spec.values():
+        needed = metric.summary_dimensions()
+        if needed is None:
+            return None
+        dimensions |= needed
+    return dimensions
+
+
+def statistics_from_histograms(spec, tallies, total):
+    """Evaluate ``spec`` from per-field histograms and the total case count."""
+    return {key: metric.from_histograms(tallies, total) for key, metric in spec.items()}
@@ -0,0 +1,180 @@
+"""
+Per-user dashboard summaries, maintained incrementally.
+
+Case apps register their distribution fields and statistics spec from
+their ``analytics`` module. For every user and program a
+``UserDashboardSummary`` row holds the number of cases the user created
+and the histogram of each field (and of the ``Distinct`` histograms of
+distinct counts), enough to answer the ``statistics`` and
+``distributions`` actions for the user's own cases.
+
+Writes made through ``CaseWriteMixin`` apply their delta to the owner's
+summary in the same transaction: the row is read, the delta merged, and
+written back only if its ``version`` is still the one read, retrying
+otherwise. A user's first summary is built from their cases, by the write
+that needs it or by ``manage.py rebuild_dashboard_summaries``; if two
+transactions both build one, the second applies its delta to the first's.
+
+Cases written before summaries existed, or by other means than the case
+viewsets, are only counted after ``rebuild_dashboard_summaries``: run it
+once before turning ``DASHBOARD_USE_SUMMARIES`` on. From then on a user
+without a summary has no cases.
+"""
+from collections import Counter as Tally, defaultdict
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.utils import OperationalError
+
+from . import rollups
+from .distributions import compute_distributions, format_histograms
+from .models import UserDashboardSummary
+from .statistics import Distinct, statistics_from_histograms, summary_dimensions
+
+# Key of the case count in a delta.
+TOTAL = (None, None)
+# Versioned writes attempted before giving up on a contended summary.
+MAX_ATTEMPTS = 10
+
+_registry = {}
+
+
+class Definition:
+    def __init__(self, model, fields, statistics):
+        self.model = model
+        self.fields = tuple(fields)
+        self.statistics = statistics
+        needed = summary_dimensions(statistics)
+        if needed is None:
+            raise ImproperlyConfigured(f'The statistics of {model.__name__} cannot be summarized.')
+        self.dimensions = {field: field for field in self.fields}
+        for dimension in needed:
+            self.dimensions[getattr(dimension, 'name', dimension)] = dimension
+
+    def values_of(self, dimension, instance):
+        if isinstance(dimension, Distinct):
+            return dimension.values_of(instance)
+        return rollups.values_of(self.model, dimension, instance)
+
+
+def register(model, fields, statistics):
+    """Summarize the ``fields`` histograms and the ``statistics`` spec of ``model``."""
+    _registry[model] = Definition(model, fields, statistics)
+
+
+def registered():
+    return dict(_registry)
+
+
+def _deltas(before, after, deltas=None):
+    deltas = defaultdict(Tally) if deltas is None else deltas
+    definition = _registry.get(type(after if after is not None else before))
+    if definition is None:
+        return deltas
+    for instance, sign in ((before, -1), (after, 1)):
+        if instance is None or instance.created_by_id is None:
+            continue
+        tally = deltas[instance.created_by_id]
+        tally[TOTAL] += sign
+        for name, dimension in definition.dimensions.items():
+            for value in definition.values_of(dimension, instance):
+                tally[(name, value)] += sign
+    return deltas
+
+
+def merge(data, tally):
+    """``data`` with the ``tally`` delta applied; values counted 0 times are dropped."""
+    histograms = {name: dict(histogram) for name, histogram in data.get('histograms', {}).items()}
+    for (name, value), delta in tally.items():
+        if (name, value) == TOTAL:
+            continue
+        histogram = histograms.setdefault(name, {})
+        count = histogram.get(value, 0) + delta
+        if count:
+            histogram[value] = count
+        else:
+            histogram.pop(value, None)
+    return {'total': data.get('total', 0) + tally[TOTAL], 'histograms': histograms}
+
+
+def build(model, owner_id):
+    """The summary ``data`` of ``owner_id``'s cases of ``model``, computed from the rows."""
+    definition = _registry[model]
+    cases = model.objects.filter(created_by_id=owner_id)
+    fields = [name for name, dimension in definition.dimensions.items() if not isinstance(dimension, Distinct)]
+    histograms = {}
+    for field, rows in compute_distributions(cases, fields).items():
+        histogram = Tally()
+        for row in rows:
+            histogram[rollups.clean(row[field])] += row['count']
+        histograms[field] = dict(histogram)
+    for name, dimension in definition.dimensions.items():
+        if isinstance(dimension, Distinct):
+            histograms[name] = dimension.histogram(cases)
+    return {'total': cases.count(), 'histograms': histograms}
+
+
+def _apply(model, deltas):
+    program = rollups.program_of(model)
+    for owner_id, tally in deltas.items():
+        tally = Tally({key: delta for key, delta in tally.items() if delta})
+        if not tally:
+            continue
+        for _ in range(MAX_ATTEMPTS):
+            summaries = UserDashboardSummary.objects.filter(user_id=owner_id, program=program)
+            current = summaries.values_list('version', 'data').first()
+            if current is None:
+                try:
+                    # The cases read include the ones of this write.
+                    with transaction.atomic():
+                        UserDashboardSummary.objects.create(
+                            user_id=owner_id, program=program, data=build(model, owner_id),
+                        )
+                    break
+                except IntegrityError:
+                    continue
+            version, data = current
+            if summaries.filter(version=version).update(data=merge(data, tally), version=F('version') + 1):
+                break
+        else:
+            raise OperationalError(f'Could not update the {program} summary of user #{owner_id}.')
+
+
+def case_changed(before, after):
+    """
+    Apply the summary delta of a case write.
+
+    ``before`` is a snapshot of the case prior to the write (``None`` on
+    create) and ``after`` the saved case (``None`` on delete). Writes that
+    change no summarized field cost no query.
+    """
+    model = type(after if after is not None else before)
+    if model in _registry:
+        _apply(model, _deltas(before, after))
+
+
+def cases_created(instances):
+    """Apply the summary delta of a batch of new cases, one write per owner."""
+    if not instances or type(instances[0]) not in _registry:
+        return
+    deltas = defaultdict(Tally)
+    for instance in instances:
+        _deltas(None, instance, deltas)
+    _apply(type(instances[0]), deltas)
+
+
+def empty(user, program):
+    """The (unsaved) summary of a user without cases."""
+    return UserDashboardSummary(user=user, program=program, version=0, data={'total': 0, 'histograms': {}})
+
+
+def render(model, summary):
+    """The ``statistics`` and ``distributions`` of ``summary``."""
+    definition = _registry[model]
+    data = summary.data
+    tallies = defaultdict(Tally, {name: Tally(histogram) for name, histogram in data['histograms'].items()})
+    return {
+        'statistics': statistics_from_histograms(definition.statistics, tallies, data['total']),
+        'distributions': format_histograms(tallies, definition.fields),
+    }
@@ -0,0 +1,131 @@
+"""
+Delta sync of the case lists for offline clients.
+
+``GET .../sync/?since=<watermark>`` returns the cases created or updated
+and the ids of the cases deleted since the watermark, then a new
+watermark to send next time. Cases are read in ``(updated_at, id)`` order
+and deletions, recorded as ``CaseTombstone`` rows, in ``(deleted_at, id)``
+order, both resuming after the positions stored in the watermark, so a
+sync costs as much as the number of changes, not the size of the list.
+
+Changes of the last ``CASE_SYNC_LAG`` seconds are held back until the next
+sync: a transaction that started earlier may still commit rows stamped
+before them, which a later watermark would otherwise skip.
+
+Watermarks are signed, and tied to the user's scope. A client whose scope
+changed, or whose watermark is older than ``CASE_SYNC_TOMBSTONE_DAYS``
+(tombstones are pruned after that), is told to ``reset``: drop its copy
+and download everything again.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from . import rollups
+from .models import CaseTombstone
+
+SALT = 'core.sync.watermark'
+
+
+class InvalidWatermark(ValueError):
+    pass
+
+
+def lag():
+    return timedelta(seconds=getattr(settings, 'CASE_SYNC_LAG', 10))
+
+
+def retention():
+    return timedelta(days=getattr(settings, 'CASE_SYNC_TOMBSTONE_DAYS', 90))
+
+
+def _position(value):
+    if value is None:
+        return None
+    stamp, pk = value
+    return parse_datetime(stamp), pk
+
+
+def _dump_position(value):
+    if value is None:
+        return None
+    stamp, pk = value
+    return [stamp.isoformat(), pk]
+
+
+def encode(scope_key, as_of, cases, deleted):
+    return signing.dumps(
+        {'s': scope_key, 'at': as_of.isoformat(), 'c': _dump_position(cases), 'd': _dump_position(deleted)},
+        salt=SALT, compress=True,
+    )
+
+
+def decode(token, scope_key, now):
+    """``(cases, deleted)`` positions of ``token``, or ``None`` when the client must reset."""
+    try:
+        data = signing.loads(token, salt=SALT)
+        as_of = parse_datetime(data['at'])
+        positions = _position(data['c']), _position(data['d'])
+    except (signing.BadSignature, KeyError, TypeError, ValueError) as e:
+        raise InvalidWatermark('Not a watermark issued by this server.') from e
+    if data['s'] != scope_key or as_of is None or as_of < now - retention():
+        return None
+    return positions
+
+
+def _after(queryset, field, position):
+    if position is None:
+        return queryset
+    stamp, pk = position
+    return queryset.filter(Q(**{f'{field}__gt': stamp}) | Q(**{field: stamp, 'pk__gt': pk}))
+
+
+def changes(cases, tombstones, positions, limit, upper):
+    """
+    One page of changes after ``positions``, up to ``limit`` rows.
+
+    Returns ``(changed cases, deleted case ids, new positions, has_more)``.
+    Deletions are read once every changed case has been sent.
+    """
+    case_position, deleted_position = positions
+    changed = list(
+        _after(cases.filter(updated_at__lt=upper), 'updated_at', case_position)
+        .order_by('updated_at', 'pk')[:limit + 1]
+    )
+    has_more = len(changed) > limit
+    changed = changed[:limit]
+    if changed:
+        case_position = changed[-1].updated_at, changed[-1].pk
+
+    deleted = []
+    if not has_more:
+        budget = limit - len(changed)
+        deleted = list(
+            _after(tombstones.filter(deleted_at__lt=upper), 'deleted_at', deleted_position)
+            .order_by('deleted_at', 'pk')
+            .values_list('deleted_at', 'pk', 'case_id')[:budget + 1]
+        )
+        has_more = len(deleted) > budget
+        deleted = deleted[:budget]
+        if deleted:
+            deleted_position = deleted[-1][:2]
+    return changed, [case_id for _, _, case_id in deleted], (case_position, deleted_position), has_more
+
+
+def record_deletion(instance):
+    """Leave a tombstone for the deleted case ``instance``."""
+    CaseTombstone.objects.create(
+        program=rollups.program_of(type(instance)),
+        case_id=instance.pk,
+        created_by_id=instance.created_by_id,
+        district=instance.district,
+    )
+
+
+def prune(before):
+    """Delete the tombstones older than ``before``; returns how many."""
+    deleted, _ = CaseTombstone.objects.filter(deleted_at__lt=before).delete()
+    return deleted
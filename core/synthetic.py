@@ -0,0 +1,205 @@
+"""
+Synthetic case data for load tests and benchmarks.
+
+Rows look like the field data: districts and diseases follow skewed
+frequencies, case dates spread over the last ``days`` days, coordinates
+fall around the district centroid and the multi-value fields hold
+comma-separated lists. Generation is seeded, so the same arguments give
+the same rows. Each program's cases are owned by synthetic users of the
+matching role (``synthetic-co-1``, ``synthetic-chw-1``, ...).
+"""
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from . import rollups
+
+# Role of the users that record each program's cases.
+ROLES = {
+    'clinical_cases': 'CO',
+    'chw_cases': 'CHW',
+    'hso_cases': 'HSO',
+}
+
+# (name, latitude, longitude), most populous first.
+DISTRICTS = (
+    ('Lilongwe', -13.98, 33.78), ('Blantyre', -15.79, 35.01), ('Mangochi', -14.48, 35.26),
+    ('Zomba', -15.38, 35.32), ('Dedza', -14.38, 34.33), ('Kasungu', -13.03, 33.48),
+    ('Mzimba', -11.90, 33.60), ('Thyolo', -16.07, 35.14), ('Mulanje', -16.03, 35.50),
+    ('Machinga', -14.97, 35.52), ('Dowa', -13.65, 33.94), ('Salima', -13.78, 34.46),
+    ('Chikwawa', -16.03, 34.80), ('Ntcheu', -14.82, 34.64), ('Phalombe', -15.81, 35.65),
+    ('Chiradzulu', -15.70, 35.18), ('Mchinji', -13.80, 32.88), ('Nkhotakota', -12.93, 34.30),
+    ('Nsanje', -16.92, 35.26), ('Karonga', -9.93, 33.93), ('Balaka', -14.98, 34.96),
+    ('Ntchisi', -13.37, 34.00), ('Mwanza', -15.60, 34.52), ('Mzuzu', -11.46, 34.02),
+    ('Nkhata Bay', -11.61, 34.30), ('Rumphi', -11.02, 33.86), ('Chitipa', -9.70, 33.27),
+    ('Neno', -15.40, 34.65), ('Likoma', -12.07, 34.73),
+)
+DISEASES = (
+    ('Malaria', 40), ('Diarrhoea', 15), ('Pneumonia', 12), ('Cholera', 8), ('Tuberculosis', 7),
+    ('Typhoid', 6), ('Measles', 5), ('COVID-19', 4), ('Mpox', 2), ('Anthrax', 1),
+)
+SYMPTOMS = (
+    'fever', 'cough', 'headache', 'vomiting', 'diarrhoea', 'rash', 'fatigue',
+    'chills', 'abdominal pain', 'difficulty breathing', 'joint pain', 'dehydration',
+)
+FIRST_NAMES = (
+    'Chikondi', 'Mphatso', 'Tadala', 'Chisomo', 'Kondwani', 'Thoko', 'Madalitso', 'Limbani',
+    'Takondwa', 'Yamikani', 'Pemphero', 'Tiyamike', 'Dalitso', 'Kettie', 'Blessings', 'Grace',
+)
+LAST_NAMES = (
+    'Banda', 'Phiri', 'Mwale', 'Chirwa', 'Tembo', 'Nyirenda', 'Kumwenda', 'Mbewe',
+    'Gondwe', 'Chisale', 'Msiska', 'Kachingwe', 'Mvula', 'Zulu', 'Jere', 'Moyo',
+)
+CLASSIFICATIONS = (('Confirmed', 5), ('Probable', 3), ('Suspected', 2))
+
+
+def _weighted(pairs):
+    values, weights = zip(*pairs)
+    return values, list(accumulate(weights))
+
+
+def _some(rng, options, most=3):
+    return ', '.join(rng.sample(options, rng.randint(1, most)))
+
+
+def _clinical(rng, case):
+    return {
+        'admission_status': rng.choice(('Discharged', 'Outpatient', 'Referred', 'Admitted')),
+        'triage_level': rng.choice(('Emergency', 'Priority', 'Queue')),
+        'vital_signs': rng.choice(('Temperature', 'Pulse', 'Respiratory Rate', 'Blood Pressure')),
+        'lab_tests_ordered': _some(rng, ('MRDT', 'FBC', 'Stool culture', 'Sputum AFB', 'Blood culture'), 2),
+        'procedures_done': _some(rng, ('IV fluids', 'Oxygen therapy', 'Wound dressing', 'Catheterization'), 2),
+        'referral_facility': rng.choice(('', '', 'Kamuzu Central Hospital', 'Queen Elizabeth Central Hospital')),
+    }
+
+
+def _chw(rng, case):
+    return {
+        'housing_type': rng.choice(('Permanent', 'Semi-permanent', 'Temporary')),
+        'number_of_dependents': rng.randint(0, 9),
+        'visit_type': rng.choice(('Outpatient', 'Inpatient', 'Emergency', 'Follow-up')),
+        'visit_date': timezone.localdate(case['created_at']) - timedelta(days=rng.randint(0, 3)),
+        'reporting_method': rng.choice(('SMS', 'Electronic_form', 'Paper')),
+        'encounter_location': rng.choice(('Household', 'Village clinic', 'School', 'Market')),
+        'follow_up_required': rng.choice(('Yes', 'No')),
+    }
+
+
+def _hso(rng, case):
+    return {
+        'supervising_facility': rng.choice(('District Hospital', 'Health Centre', 'Rural Hospital')),
+        'reporting_method': rng.choice(('SMS', 'Electronic_form', 'Paper')),
+        'population_estimate': rng.randint(500, 20000),
+        'case_source': rng.choice(('School', 'Border_post', 'Community', 'Facility')),
+        'contact_tracing_done': rng.choice(('Yes', 'No')),
+        'environmental_risk_factors': rng.choice(('Stagnant Water', 'Poor Waste Disposal', 'Blocked Drainage', '')),
+        'vector_control_measure': rng.choice(('IRS', 'ITN distribution', 'Larviciding', '')),
+    }
+
+
+PROGRAM_FIELDS = {
+    'clinical_cases': _clinical,
+    'chw_cases': _chw,
+    'hso_cases': _hso,
+}
+
+
+def program_models():
+    """``{program: Case model}`` of the registered case apps."""
+    return {rollups.program_of(model): model for model in rollups.registered()}
+
+
+def ensure_users(count, programs):
+    """Return ``{program: [users]}``, creating ``count`` synthetic users per role as needed."""
+    User = get_user_model()
+    owners = {}
+    for program in programs:
+        role = ROLES[program]
+        names = [f'synthetic-{role.lower()}-{index}' for index in range(1, count + 1)]
+        existing = set(User.objects.filter(username__in=names).values_list('username', flat=True))
+        new_users = []
+        for name in names:
+            if name not in existing:
+                user = User(username=name, role=role)
+                user.set_unusable_password()
+                new_users.append(user)
+        User.objects.bulk_create(new_users)
+        owners[program] = list(User.objects.filter(username__in=names).order_by('pk'))
+    return owners
+
+
+@contextmanager
+def explicit_created_at(model):
+    """Let ``bulk_create`` keep the ``created_at``/``updated_at`` set on the instances."""
+    created, updated = model._meta.get_field('created_at'), model._meta.get_field('updated_at')
+    auto_now_add, auto_now = created.auto_now_add, updated.auto_now
+    created.auto_now_add = updated.auto_now = False
+    try:
+        yield
+    finally:
+        created.auto_now_add, updated.auto_now = auto_now_add, auto_now
+
+
+class CaseFactory:
+    """
+    Builds synthetic cases of one program.
+
+    ``districts`` is the number of districts used, most populous first;
+    beyond the real ones, numbered districts are placed at random in the
+    country. ``days`` is the age of the oldest case.
+    """
+
+    def __init__(self, program, owners, districts=len(DISTRICTS), days=365, seed=0, now=None):
+        self.program = program
+        self.model = program_models()[program]
+        self.owners = owners
+        self.days = days
+        self.now = now or timezone.now()
+        self.rng = random.Random(f'{seed}-{program}')
+        pool = list(DISTRICTS[:districts]) + [
+            (f'District {number}', self.rng.uniform(-17.0, -9.5), self.rng.uniform(32.8, 35.8))
+            for number in range(len(DISTRICTS) + 1, districts + 1)
+        ]
+        self.districts = _weighted((district, 1 / rank) for rank, district in enumerate(pool, start=1))
+        self.diseases = _weighted(DISEASES)
+        self.classifications = _weighted(CLASSIFICATIONS)
+
+    def values(self):
+        """Field values of one case, keyed by model field."""
+        rng = self.rng
+        district, latitude, longitude = rng.choices(self.districts[0], cum_weights=self.districts[1])[0]
+        case = {
+            'created_by': rng.choice(self.owners),
+            'created_at': self.now - timedelta(seconds=rng.randrange(self.days * 86400)),
+            'patient_name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            'age': rng.randint(0, 90),
+            'sex': rng.choice(('Male', 'Female')),
+            'disease': rng.choices(self.diseases[0], cum_weights=self.diseases[1])[0],
+            'classification': rng.choices(self.classifications[0], cum_weights=self.classifications[1])[0],
+            'district': district,
+            'latitude': round(latitude + rng.uniform(-0.3, 0.3), 6),
+            'longitude': round(longitude + rng.uniform(-0.3, 0.3), 6),
+            'symptoms': _some(rng, SYMPTOMS),
+            'diagnosis': rng.choice(('Uncomplicated', 'Severe', 'Complicated', '')),
+            'treatment': rng.choice(('ACT', 'ORS', 'Antibiotics', 'Supportive care', 'Referral')),
+            'notes': rng.choice(('', 'Patient stable', 'Lives near the river', 'Recent travel to Mozambique')),
+        }
+        case.update(PROGRAM_FIELDS[self.program](rng, case))
+        case['updated_at'] = case['created_at']
+        return case
+
+    def payload(self):
+        """Values of one case as a request body: no owner, no timestamps."""
+        case = self.values()
+        del case['created_by'], case['created_at'], case['updated_at']
+        if 'visit_date' in case:
+            case['visit_date'] = case['visit_date'].isoformat()
+        return case
+
+    def build(self, count):
+        """``count`` unsaved cases."""
+        return [self.model(**self.values()) for _ in range(count)]
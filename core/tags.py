@@ -0,0 +1,97 @@
+"""
+Normalized tags for the multi-value free-text case fields.
+
+Fields such as ``symptoms`` hold comma-separated lists ("fever, cough").
+Each registered field is parsed into lower-cased, de-duplicated names
+stored in ``core.Tag`` and linked to the case through a many-to-many
+field, so "fever, cough" and "Cough; fever" count as the same two tags and
+histograms are an indexed join instead of a GROUP BY on free text.
+
+Case apps register ``{source field: m2m field}`` in their ``analytics``
+module. ``CaseWriteMixin`` keeps the links in sync on every write and
+``manage.py rebuild_tags`` backfills them.
+"""
+import re
+
+from django.db.models import Count
+
+from .models import Tag
+
+SEPARATORS = re.compile(r'[,;/|\n]+')
+
+_registry = {}
+
+
+def register(model, fields):
+    """Tag ``fields`` of ``model``, a ``{source field: m2m field}`` mapping."""
+    _registry[model] = dict(fields)
+
+
+def registered():
+    return dict(_registry)
+
+
+def tag_field(model, field):
+    """The m2m field holding the tags of ``field``, or ``None`` if untagged."""
+    return _registry.get(model, {}).get(field)
+
+
+def parse(text):
+    """Normalized tag names of a free-text value, in first-seen order."""
+    names = (' '.join(part.split()).lower() for part in SEPARATORS.split(text or ''))
+    max_length = Tag._meta.get_field('name').max_length
+    return list(dict.fromkeys(name[:max_length] for name in names if name))
+
+
+def values_of(instance, field):
+    """Histogram keys a case contributes for ``field``: its tags, or ``''`` if it has none."""
+    return parse(getattr(instance, field)) or ['']
+
+
+def _tag_ids(kind, names):
+    if not names:
+        return {}
+    Tag.objects.bulk_create([Tag(kind=kind, name=name) for name in names], ignore_conflicts=True)
+    return dict(Tag.objects.filter(kind=kind, name__in=names).values_list('name', 'id'))
+
+
+def sync(instances, before=()):
+    """
+    Replace the tag links of ``instances`` with the parsed values of their fields.
+
+    ``before`` holds snapshots of (some of) the instances before the write;
+    fields whose tags did not change keep their links untouched.
+    """
+    instances = [instance for instance in instances if type(instance) in _registry]
+    if not instances:
+        return
+    model = type(instances[0])
+    before = {snapshot.pk: snapshot for snapshot in before}
+    for source, m2m in _registry[model].items():
+        parsed = {}
+        for instance in instances:
+            names = parse(getattr(instance, source))
+            if instance.pk not in before or set(names) != set(parse(getattr(before[instance.pk], source))):
+                parsed[instance.pk] = names
+        if not parsed:
+            continue
+        ids = _tag_ids(source, sorted({name for names in parsed.values() for name in names}))
+        field = model._meta.get_field(m2m)
+        through = field.remote_field.through
+        case_id, tag_id = f'{field.m2m_field_name()}_id', f'{field.m2m_reverse_field_name()}_id'
+        through.objects.filter(**{f'{case_id}__in': list(parsed)}).delete()
+        through.objects.bulk_create([
+            through(**{case_id: pk, tag_id: ids[name]})
+            for pk, names in parsed.items() for name in names
+        ])
+
+
+def histogram(queryset, field):
+    """``{tag name: case count}`` of ``field`` for ``queryset``; untagged cases count under ``''``."""
+    m2m = tag_field(queryset.model, field)
+    rows = (
+        queryset.order_by()
+        .values_list(f'{m2m}__name')
+        .annotate(count=Count('pk'))
+    )
+    return {('' if name is None else name): count for name, count in rows}
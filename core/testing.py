@@ -0,0 +1,22 @@
+"""Test helpers shared by the case apps."""
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .models import ProgramGeneration
+
+
+@contextmanager
+def assert_queries_after_generation(test, count):
+    """
+    Assert that a case GET runs the primary-key lookup of its ETag
+    generation (see ``core.conditional``), then ``count`` queries.
+    """
+    table = ProgramGeneration._meta.db_table
+    with CaptureQueriesContext(connection) as context:
+        yield context
+    queries = [query['sql'] for query in context.captured_queries]
+    test.assertEqual(len(queries), count + 1, '\n'.join(queries))
+    test.assertIn(f'FROM "{table}" WHERE "{table}"."program" = ', queries[0])
+    test.assertTrue(all(table not in sql for sql in queries[1:]), '\n'.join(queries))
@@ -0,0 +1,18 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+from .views import (
+    AnalyticsCacheStatsView, AnalyticsDashboardView, CrossProgramAnalyticsView, DashboardSummaryView, JobViewSet,
+    RequestMetricsView,
+)
+
+router = DefaultRouter()
+router.register(r'jobs', JobViewSet, basename='job')
+
+urlpatterns = [
+    path('analytics/', CrossProgramAnalyticsView.as_view(), name='cross_program_analytics'),
+    path('analytics/dashboard/', AnalyticsDashboardView.as_view(), name='analytics_dashboard'),
+    path('dashboard/', DashboardSummaryView.as_view(), name='dashboard_summary'),
+    path('analytics/cache/', AnalyticsCacheStatsView.as_view(), name='analytics_cache_stats'),
+    path('metrics/requests/', RequestMetricsView.as_view(), name='request_metrics'),
+    path('', include(router.urls)),
+]
@@ -0,0 +1,222 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views import View
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, NotAuthenticated, ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.views import APIView
+
+from . import cache, dashboard, epicurve, jobs, metrics, programs, rollups, routers, scoping, summaries
+from .models import Job, UserDashboardSummary
+from .params import query_list
+from .serializers import JobSerializer
+
+
+class Conflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The job is not in a state allowing this.'
+    default_code = 'conflict'
+
+
+class AnalyticsCacheStatsView(APIView):
+    """
+    Hit/miss counters of the analytics response cache (this process only).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(cache.stats())
+
+
+class RequestMetricsView(APIView):
+    """
+    Per-endpoint request metrics of this process, slowest p95 first.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(metrics.registry.report())
+
+
+def prometheus_metrics(request):
+    """
+    Request metrics in the Prometheus text format, for scrapers.
+
+    Requires ``Authorization: Bearer <METRICS_TOKEN>``; without that setting
+    the endpoint only exists with ``DEBUG``.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if not token:
+        if not settings.DEBUG:
+            raise Http404
+    elif not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(metrics.registry.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class JobViewSet(
+    mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin, mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Background runs of the heavy case actions (see ``core.jobs``).
+
+    ``POST`` with ``kind`` (``export`` or ``epicurve``), ``program`` and the
+    action's query parameters in ``params`` queues a job and answers
+    ``202`` with its id; poll it until ``status`` is ``succeeded``, then
+    fetch ``download``. Past ``JOBS_MAX_QUEUED_PER_USER`` waiting jobs the
+    ``POST`` is refused with ``429``. Users only see their own jobs.
+    Deleting a job removes its result; running jobs cannot be deleted.
+    """
+    serializer_class = JobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Job.objects.filter(user=self.request.user).order_by('-created_at', '-id')
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        job = jobs.submit(request.user, data['kind'], data['program'], data.get('params', {}))
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    def perform_destroy(self, instance):
+        if instance.status == Job.RUNNING:
+            raise Conflict('The job is running.')
+        instance.result.delete(save=False)
+        instance.delete()
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != Job.SUCCEEDED:
+            raise Conflict(f'The job is {job.status}.')
+        return FileResponse(
+            job.result.open('rb'), as_attachment=True, filename=job.filename, content_type=job.content_type,
+        )
+
+
+class CrossProgramAnalyticsView(APIView):
+    """
+    Combined statistics, distributions and epicurve of all case programs.
+
+    Each program is limited to the cases the user may read (``core.scoping``).
+    Query parameters: ``fields`` (subset of disease, district, sex),
+    ``interval`` (day, week or month), ``programs`` (app labels),
+    ``disease`` and ``district``.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_querysets(self, request, labels):
+        models = {rollups.program_of(model): model for model in rollups.registered()}
+        querysets = {}
+        for label in labels:
+            cases = models[label].objects.filter(scoping.for_user(request.user, label).reads)
+            for name in ('disease', 'district'):
+                if request.query_params.get(name):
+                    cases = cases.filter(**{name: request.query_params[name]})
+            querysets[label] = cases
+        return querysets
+
+    def get(self, request):
+        labels = query_list(
+            request.query_params, 'programs', [rollups.program_of(model) for model in rollups.registered()],
+        )
+        fields = query_list(request.query_params, 'fields', programs.COMMON_FIELDS)
+        interval = request.query_params.get('interval', 'week')
+        if interval not in epicurve.INTERVALS:
+            raise ValidationError({'interval': f"Expected one of: {', '.join(epicurve.INTERVALS)}"})
+        with routers.analytics_reads(*labels):
+            data = programs.combined_analytics(self.get_querysets(request, labels), fields, interval)
+        return Response(data)
+
+
+class DashboardSummaryView(APIView):
+    """
+    Statistics and distributions of every program for the user, precomputed.
+
+    With ``DASHBOARD_USE_SUMMARIES``, programs where the user reads exactly
+    the cases they created are served from their ``UserDashboardSummary``
+    rows (see ``core.summaries``), all fetched by one indexed query, with
+    the summary's ``version`` (0 for a user without cases). Other programs
+    (district or staff scope) are computed like the ``statistics`` and
+    ``distributions`` actions and have a ``null`` version.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def compute(self, viewset_class, request):
+        view = viewset_class(action='dashboard', format_kwarg=None, args=(), kwargs={})
+        view.request = request
+        with routers.analytics_reads(view.get_program()):
+            return {
+                'statistics': view.get_statistics(),
+                'distributions': view.get_distributions(list(view.distribution_fields)),
+            }
+
+    def get(self, request):
+        viewsets = dashboard.program_viewsets()
+        own = set()
+        if getattr(settings, 'DASHBOARD_USE_SUMMARIES', False):
+            own = {program for program in viewsets if scoping.for_user(request.user, program).owner_only}
+        stored = {}
+        if own:
+            stored = {
+                summary.program: summary
+                for summary in UserDashboardSummary.objects.filter(user=request.user, program__in=own)
+            }
+        data = {}
+        for program, viewset_class in viewsets.items():
+            if program in own:
+                summary = stored.get(program) or summaries.empty(request.user, program)
+                data[program] = {
+                    'version': summary.version, **summaries.render(viewset_class.queryset.model, summary),
+                }
+            else:
+                data[program] = {'version': None, **self.compute(viewset_class, request)}
+        return Response({'programs': data})
+
+
+def _json(data, status=200):
+    with metrics.serializing():
+        body = json.dumps(data, cls=JSONEncoder)
+    return HttpResponse(body, status=status, content_type='application/json')
+
+
+class AnalyticsDashboardView(View):
+    """
+    Every dashboard panel of the user's programs in one response, served async.
+
+    For each program: ``total``, ``statistics``, ``distributions``,
+    ``epicurve`` and the ``latest`` cases, computed concurrently (see
+    ``core.dashboard``). Query parameters: ``programs`` (app labels),
+    ``fields`` (distribution fields; each program keeps those it has),
+    ``recent`` (latest cases, at most 50, default 10), ``q`` and the
+    parameters of the ``epicurve`` action. Authenticates like the API.
+    """
+
+    async def get(self, request):
+        request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+        try:
+            user = await sync_to_async(lambda: request.user)()
+            if not user.is_authenticated:
+                raise NotAuthenticated()
+            labels = query_list(request.query_params, 'programs', list(dashboard.program_viewsets()))
+            fields = query_list(request.query_params, 'fields') or None
+            try:
+                recent = min(max(int(request.query_params.get('recent', 10)), 0), 50)
+            except ValueError:
+                raise ValidationError({'recent': 'Expected an integer.'})
+            data = await dashboard.build(request, labels, fields, recent)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+            return _json(detail, status=exc.status_code)
+        return _json({'programs': data})
@@ -0,0 +1,48 @@
+from core import rollups, search, summaries, tags
+from core.statistics import Counter
+from .models import Case
+
+# Counters returned by ``HSOCaseViewSet.statistics``, in response order.
+STATISTICS = {
+    'total_cases': Counter(),
+    'male_cases': Counter(sex='Male'),
+    'female_cases': Counter(sex='Female'),
+    'classification_prob': Counter(classification='Probable'),
+    'classification_conf': Counter(classification='Confirmed'),
+    'sch_case_source': Counter(case_source='School'),
+    'bor_case_source': Counter(case_source='Border_post'),
+    'com_case_source': Counter(case_source='Community'),
+    'sms_reporting_method': Counter(reporting_method='SMS'),
+    'ele_reporting_method': Counter(reporting_method='Electronic_form'),
+    'sta_env_risk_factors': Counter(environmental_risk_factors='Stagnant Water'),
+    'pwd_env_risk_factors': Counter(environmental_risk_factors='Poor Waste Disposal'),
+    'bdr_env_risk_factors': Counter(environmental_risk_factors='Blocked Drainage'),
+}
+
+# Fields accepted by ``?fields=`` on the ``distributions`` action.
+DISTRIBUTION_FIELDS = (
+    'district',
+    'disease',
+    'sex',
+    'classification',
+    'case_source',
+    'supervising_facility',
+    'reporting_method',
+    'treatment',
+    'diagnosis',
+    'symptoms',
+    'vector_control_measure',
+    'environmental_risk_factors',
+)
+
+# Free-text fields searched by ``?q=``, patient_name first. The PostgreSQL
+# index is built from this list, so changing it needs a new migration.
+SEARCH_FIELDS = ('patient_name', 'symptoms', 'diagnosis', 'notes', 'surveillance_notes')
+
+# Comma-separated list fields counted per item, ``{field: m2m field}``.
+TAG_FIELDS = {'symptoms': 'symptom_tags'}
+
+rollups.register(Case, DISTRIBUTION_FIELDS)
+summaries.register(Case, DISTRIBUTION_FIELDS, STATISTICS)
+search.register(Case, SEARCH_FIELDS)
+tags.register(Case, TAG_FIELDS)
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from core import search
+
+install_search = search.install(
+    'hso_cases_case', 'hso',
+    ('patient_name', 'symptoms', 'diagnosis', 'notes', 'surveillance_notes'),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hso_cases', '0008_case_epicurve_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(*install_search),
+    ]
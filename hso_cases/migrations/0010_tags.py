@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tag'),
+        ('hso_cases', '0009_case_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='symptom_tags',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='+', to='core.tag'),
+        ),
+    ]
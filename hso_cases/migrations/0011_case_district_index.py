@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tag'),
+        ('hso_cases', '0010_tags'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['district', 'created_at'], name='hso_district_created_idx'),
+        ),
+    ]
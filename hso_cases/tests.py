@@ -0,0 +1,132 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.testing import assert_queries_after_generation
+from users.models import User
+from .models import Case
+
+
+@override_settings(ANALYTICS_CACHE=None)
+class StatisticsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='hso', password='pass', role='HSO')
+        self.client.force_authenticate(self.user)
+        Case.objects.create(created_by=self.user, sex='Male', case_source='School', reporting_method='SMS')
+        Case.objects.create(created_by=self.user, sex='Female', environmental_risk_factors='Stagnant Water')
+        other = User.objects.create_user(username='other', password='pass', role='HSO')
+        Case.objects.create(created_by=other, sex='Male', case_source='School')
+
+    def test_statistics_is_a_single_query(self):
+        with assert_queries_after_generation(self, 1):
+            response = self.client.get(reverse('hso_case-statistics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_cases'], 2)
+        self.assertEqual(response.data['sch_case_source'], 1)
+        self.assertEqual(response.data['sms_reporting_method'], 1)
+        self.assertEqual(response.data['sta_env_risk_factors'], 1)
+        self.assertEqual(list(response.data)[-1], 'bdr_env_risk_factors')
+
+
+@override_settings(ANALYTICS_CACHE=None)
+class DistributionTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='hso', password='pass', role='HSO')
+        self.client.force_authenticate(self.user)
+        Case.objects.create(created_by=self.user, sex='Male', vector_control_measure='Spraying')
+        other = User.objects.create_user(username='other', password='pass', role='HSO')
+        Case.objects.create(created_by=other, sex='Female', vector_control_measure='Nets')
+
+    def test_distributions_only_counts_own_cases(self):
+        response = self.client.get(reverse('hso_case-distributions'), {'fields': 'sex,vector_control_measure'})
+        self.assertEqual(response.data, {
+            'sex': [{'sex': 'Male', 'count': 1}],
+            'vector_control_measure': [{'vector_control_measure': 'Spraying', 'count': 1}],
+        })
+
+    def test_gender_alias(self):
+        response = self.client.get(reverse('hso_case-gender-distribution'))
+        self.assertEqual(response.data, [{'sex': 'Male', 'count': 1}])
+
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='hso', password='pass', role='HSO')
+        self.client.force_authenticate(self.user)
+        self.case = Case.objects.create(created_by=self.user, patient_name='Ada', notes='long notes', district='Zomba')
+
+    def test_list_is_compact_and_detail_is_full(self):
+        row = self.client.get(reverse('hso_case-list')).data['results'][0]
+        self.assertNotIn('notes', row)
+        self.assertEqual(row['district'], 'Zomba')
+        detail = self.client.get(reverse('hso_case-detail', args=[self.case.pk])).data
+        self.assertEqual(detail['notes'], 'long notes')
+
+    def test_fields_narrow_the_payload_and_the_sql(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('hso_case-list'), {'fields': 'id,patient_name'})
+        self.assertEqual(response.data['results'], [{'id': self.case.pk, 'patient_name': 'Ada'}])
+        self.assertNotIn('"notes"', queries[-1]['sql'])
+        self.assertNotIn('"district"', queries[-1]['sql'])
+
+    def test_exclude_on_detail(self):
+        response = self.client.get(reverse('hso_case-detail', args=[self.case.pk]), {'exclude': 'notes,address'})
+        self.assertNotIn('notes', response.data)
+        self.assertIn('surveillance_notes', response.data)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse('hso_case-list'), {'fields': 'secret'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(ANALYTICS_CACHE=None)
+class MapTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='hso', password='pass', role='HSO')
+        self.client.force_authenticate(self.user)
+        # Two cases in Lilongwe, one in Blantyre, one without coordinates.
+        Case.objects.create(created_by=self.user, latitude=-13.98, longitude=33.78)
+        Case.objects.create(created_by=self.user, latitude=-13.97, longitude=33.79)
+        Case.objects.create(created_by=self.user, latitude=-15.78, longitude=35.00)
+        Case.objects.create(created_by=self.user)
+        self.url = reverse('hso_case-map')
+
+    def test_geohash_is_computed_on_save(self):
+        case = Case.objects.create(created_by=self.user, latitude=57.64911, longitude=10.40744)
+        self.assertEqual(case.geohash[:11], 'u4pruydqqvj')
+        case.latitude = None
+        case.save()
+        self.assertEqual(case.geohash, '')
+
+    def test_cells_follow_the_zoom_level(self):
+        response = self.client.get(self.url, {'bbox': '32,-17,36,-9', 'zoom': 9})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(sorted(cell['count'] for cell in response.data['cells']), [1, 2])
+        self.assertEqual(len(response.data['points']), 3)
+
+        response = self.client.get(self.url, {'bbox': '32,-17,36,-9', 'zoom': 0, 'sample': 0})
+        self.assertEqual([cell['count'] for cell in response.data['cells']], [3])
+        self.assertEqual(response.data['points'], [])
+
+    def test_bbox_excludes_outside_points(self):
+        response = self.client.get(self.url, {'bbox': '33.5,-14.5,34,-13.5', 'zoom': 12})
+        self.assertEqual(response.data['total'], 2)
+
+    def test_bbox_is_narrowed_to_prefix_ranges_in_byte_order(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'bbox': '33.5,-14.5,34,-13.5', 'zoom': 12})
+        cells = next(query['sql'] for query in queries.captured_queries if 'GROUP BY' in query['sql'])
+        self.assertRegex(cells, r'"geohash" >= \'(\w+)\' AND "hso_cases_case"."geohash" < \'\1\{\'')
+        field = Case._meta.get_field('geohash')
+        self.assertIsNone(field.db_parameters(connection)['collation'])
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            self.assertEqual(field.db_parameters(connection)['collation'], 'C')
+
+    def test_invalid_bbox(self):
+        self.assertEqual(self.client.get(self.url, {'bbox': '36,-17,32,-9'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 400)
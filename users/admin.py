@@ -1,3 +1,11 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
 
-# Register your models here.
+from .models import User
+
+
+@admin.register(User)
+class CaseUserAdmin(UserAdmin):
+    fieldsets = UserAdmin.fieldsets + (('Case access', {'fields': ('role', 'districts')}),)
+    list_display = UserAdmin.list_display + ('role',)
+    list_filter = UserAdmin.list_filter + ('role',)
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from . import authentication
+        from .models import User
+
+        post_save.connect(authentication.user_changed, sender=User, dispatch_uid='users.auth.save')
+        post_delete.connect(authentication.user_changed, sender=User, dispatch_uid='users.auth.delete')
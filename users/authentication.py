@@ -0,0 +1,97 @@
+"""
+JWT authentication without a user query on every request.
+
+Tokens issued by ``LoginView`` carry the user's ``role`` and an ``auth_stamp``
+claim: a keyed hash of the user's password hash, role and active flag.
+``CachedJWTAuthentication`` keeps the user in ``AUTH_USER_CACHE`` for
+``AUTH_USER_CACHE_TIMEOUT`` seconds and serves it while the token's stamp
+matches the cached one. Saving or deleting a user drops its entry, so after
+a password, role or active change the next request reloads the user, and
+tokens carrying the old stamp are rejected. Tokens without a stamp are
+checked against the database on every request, as before.
+
+The cache must be shared by all processes (``CACHES``, see
+``config/cache.py``) for a change made in one of them to reach the others.
+When ``AUTH_USER_CACHE`` is ``None`` or a per-process alias (local memory,
+dummy), users are loaded from the database on every request instead.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.crypto import salted_hmac
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+STAMP_CLAIM = 'auth_stamp'
+ROLE_CLAIM = 'role'
+
+
+def token_stamp(user):
+    """Changes whenever the user's password, role or active flag does."""
+    value = f'{user.password}|{user.role}|{user.is_active}'
+    return salted_hmac('users.authentication.token_stamp', value).hexdigest()[:24]
+
+
+def check_stamp(token, user):
+    """Reject ``token`` if it was issued before ``user`` last changed."""
+    stamp = token.get(STAMP_CLAIM)
+    if stamp is not None and stamp != token_stamp(user):
+        raise AuthenticationFailed(
+            _("The user's password or role has changed."), code='token_revoked',
+        )
+
+
+def _cache():
+    """The user cache, or ``None`` when no cache is shared by all processes."""
+    alias = getattr(settings, 'AUTH_USER_CACHE', 'default')
+    if alias is None:
+        return None
+    cache = caches[alias]
+    # Other processes would keep serving a revoked user from their own copy.
+    if isinstance(cache, (LocMemCache, DummyCache)):
+        return None
+    return cache
+
+
+def _key(user_id):
+    return f'users:auth:{user_id}'
+
+
+def forget(user_id):
+    """Drop the cached user, e.g. after it changed."""
+    cache = _cache()
+    if cache is not None:
+        cache.delete(_key(user_id))
+
+
+def user_changed(sender, instance, **kwargs):
+    """``post_save``/``post_delete`` receiver for the user model."""
+    forget(instance.pk)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` serving stamped tokens' users from the cache."""
+
+    def get_user(self, validated_token):
+        stamp = validated_token.get(STAMP_CLAIM)
+        if stamp is None:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        cache = _cache()
+        cached = cache.get(_key(user_id)) if cache is not None else None
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        user = super().get_user(validated_token)
+        check_stamp(validated_token, user)
+        if cache is not None:
+            timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300)
+            cache.set(_key(user_id), (stamp, user), timeout)
+        return user
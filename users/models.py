@@ -8,6 +8,8 @@ class User(AbstractUser):
         ('HSO', 'Health Surveillance Officer'),
     ]
     role = models.CharField(max_length=3, choices=ROLE_CHOICES)
+    # Districts whose cases the user reads on top of their own (core.scoping).
+    districts = models.JSONField(default=list, blank=True)
 
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
@@ -1,6 +1,10 @@
 from rest_framework import serializers
 from .models import User
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import ROLE_CLAIM, STAMP_CLAIM, check_stamp, token_stamp
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
@@ -26,5 +30,26 @@ class UserSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = User
-        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'role', 'role_display')
-     
\ No newline at end of file
+        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'role', 'role_display', 'districts')
+     
+
+class LoginSerializer(TokenObtainPairSerializer):
+    """Token pair with the user's role and auth stamp as claims."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[ROLE_CLAIM] = user.role
+        token[STAMP_CLAIM] = token_stamp(user)
+        return token
+
+
+class RefreshSerializer(TokenRefreshSerializer):
+    """Refuses to refresh tokens issued before a password or role change."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(pk=refresh.get(api_settings.USER_ID_CLAIM)).first()
+        if user is not None:
+            check_stamp(refresh, user)
+        return super().validate(attrs)
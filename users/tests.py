@@ -1,3 +1,83 @@
-from django.test import TestCase
+import re
+import tempfile
 
-# Create your tests here.
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from users.models import User
+
+
+def queries(response):
+    return int(re.search(r'"(\d+) queries"', response['Server-Timing']).group(1))
+
+
+class TokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        # Users are only cached in a cache shared by the processes.
+        location = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+        }))
+        self.user = User.objects.create_user(username='co', password='old-pass-123', role='CO')
+
+    def login(self, password='old-pass-123'):
+        response = self.client.post(reverse('token_obtain_pair'), {'username': 'co', 'password': password})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def get(self, access, url=None):
+        return self.client.get(url or reverse('clinical_case-list'), HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    def test_login_embeds_role_and_stamp(self):
+        token = AccessToken(self.login()['access'])
+        self.assertEqual(token['role'], 'CO')
+        self.assertEqual(token['user_id'], str(self.user.pk))
+        self.assertIn('auth_stamp', token)
+
+    def test_user_is_cached_between_requests(self):
+        access = self.login()['access']
+        first, second = self.get(access), self.get(access)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(queries(second), queries(first) - 1)
+        self.assertEqual(self.get(access, reverse('me')).json()['role'], 'CO')
+
+    def test_per_process_cache_is_not_used(self):
+        access = self.login()['access']
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            first, second = self.get(access), self.get(access)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(queries(second), queries(first))
+
+    def test_password_change_revokes_tokens(self):
+        tokens = self.login()
+        self.assertEqual(self.get(tokens['access']).status_code, 200)
+        self.user.set_password('new-pass-456')
+        self.user.save()
+        self.assertEqual(self.get(tokens['access']).status_code, 401)
+        response = self.client.post(reverse('token_refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.get(self.login('new-pass-456')['access']).status_code, 200)
+
+    def test_role_change_and_deactivation_revoke_tokens(self):
+        access = self.login()['access']
+        self.get(access)
+        self.user.role = 'HSO'
+        self.user.save()
+        self.assertEqual(self.get(access).status_code, 401)
+        access = self.login()['access']
+        self.assertEqual(AccessToken(access)['role'], 'HSO')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get(access).status_code, 401)
+
+    def test_unstamped_tokens_are_checked_against_the_database(self):
+        access = RefreshToken.for_user(self.user).access_token
+        self.assertEqual(self.get(access).status_code, 200)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.get(access).status_code, 401)
+
+    def test_refresh_keeps_the_claims(self):
+        response = self.client.post(reverse('token_refresh'), {'refresh': self.login()['refresh']})
+        self.assertEqual(AccessToken(response.json()['access'])['role'], 'CO')
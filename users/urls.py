@@ -1,11 +1,10 @@
 from django.urls import path
-from .views import RegisterView, MeView
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .views import LoginView, MeView, RefreshView, RegisterView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
-    path('login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('login/', LoginView.as_view(), name='token_obtain_pair'),
+    path('token/refresh/', RefreshView.as_view(), name='token_refresh'),
     path('me/', MeView.as_view(), name='me'),
 ]
     
\ No newline at end of file
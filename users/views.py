@@ -1,5 +1,6 @@
 from rest_framework import generics, permissions
-from .serializers import RegisterSerializer, UserSerializer
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from .serializers import LoginSerializer, RefreshSerializer, RegisterSerializer, UserSerializer
 from .models import User
 
 class RegisterView(generics.CreateAPIView):
@@ -13,4 +14,9 @@ class MeView(generics.RetrieveAPIView):
 
     def get_object(self):
         return self.request.user
-            
\ No newline at end of file
+
+class LoginView(TokenObtainPairView):
+    serializer_class = LoginSerializer
+
+class RefreshView(TokenRefreshView):
+    serializer_class = RefreshSerializer